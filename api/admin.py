@@ -1,10 +1,13 @@
 from django.contrib import admin
 
-from api.models import Player, Word, Game, Guess
+from api.models import Player, Word, Game, Guess, PlayerStats, MatchTicket, ArchivedGame, GameFinishTask
 
 # Register your models here.
 admin.site.register(Player)
 admin.site.register(Word)
 admin.site.register(Game)
 admin.site.register(Guess)
-
+admin.site.register(PlayerStats)
+admin.site.register(MatchTicket)
+admin.site.register(ArchivedGame)
+admin.site.register(GameFinishTask)
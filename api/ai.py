@@ -0,0 +1,157 @@
+"""
+The AI opponent of single-player games (Game.ai_level).
+
+The AI only sees what a human sees: the masked word, the guessed letters
+and the game's difficulty. Candidates are the words of that difficulty with
+the same length, kept as bitsets (Python ints, one bit per word) per
+``(position, letter)`` and per letter, so narrowing the candidates to those
+matching the masked pattern and the wrong guesses is a few big-int ANDs,
+and scoring a letter is one AND and one popcount, whatever the size of the
+dictionary.
+
+The best letter is the one most remaining candidates contain. The level is
+the chance the AI plays it; otherwise it picks any unguessed letter seen in
+words of that length.
+"""
+
+import random
+import threading
+
+from api.letters import letter_bit, letter_positions
+from api.word_pool import word_pool
+
+
+LEVELS = {'easy': 0.35, 'medium': 0.7, 'hard': 1.0}
+
+
+def bitset(indexes, size):
+    bits = bytearray((size + 7) // 8)
+    for i in indexes:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class LengthIndex:
+    """Bitsets over the words of one difficulty and length."""
+
+    __slots__ = ('size', 'everything', 'at', 'containing', 'letters')
+
+    def __init__(self, words):
+        self.size = len(words)
+        self.everything = (1 << self.size) - 1
+        at, containing = {}, {}
+        for i, word in enumerate(words):
+            for letter, positions in letter_positions(word).items():
+                containing.setdefault(letter, []).append(i)
+                for position in positions:
+                    at.setdefault((position, letter), []).append(i)
+        self.at = {key: bitset(indexes, self.size) for key, indexes in at.items()}
+        self.containing = {letter: bitset(indexes, self.size) for letter, indexes in containing.items()}
+        # حروف به ترتیب تعداد کلمه‌هایی که دارندشان؛ برای شکستن تساوی و حالت بدون نامزد
+        self.letters = sorted(containing, key=lambda letter: (-len(containing[letter]), letter))
+
+    def candidates(self, masked_word, wrong_letters):
+        """Bitset of the words matching ``masked_word`` that contain none of ``wrong_letters``."""
+        candidates = self.everything
+        hidden = []
+        for position, letter in enumerate(masked_word):
+            if letter == '_':
+                hidden.append(position)
+            else:
+                candidates &= self.at.get((position, letter), 0)
+        # حرف آشکارشده همه‌ی جاهایش آشکار شده است
+        for letter in set(masked_word) - {'_'}:
+            for position in hidden:
+                candidates &= ~self.at.get((position, letter), 0)
+        for letter in wrong_letters:
+            candidates &= ~self.containing.get(letter, 0)
+        return candidates
+
+    def best_letter(self, candidates, guessed):
+        best, best_count = None, 0
+        for letter in self.letters:
+            if letter in guessed:
+                continue
+            count = (candidates & self.containing[letter]).bit_count()
+            if count > best_count:
+                best, best_count = letter, count
+        return best
+
+
+class DifficultyIndex:
+    def __init__(self, words):
+        self.words = words
+        self._lengths = {}
+        self._lock = threading.Lock()
+
+    def for_length(self, length):
+        index = self._lengths.get(length)
+        if index is None:
+            with self._lock:
+                index = self._lengths.get(length)
+                if index is None:
+                    index = self._lengths[length] = LengthIndex([word for word in self.words if len(word) == length])
+        return index
+
+
+class AIPlayer:
+    """
+    Chooses the AI's letters. Indexes are built per process from the word
+    pool on first use and rebuilt when the pool is invalidated.
+    """
+
+    def __init__(self, rng=None):
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self.random = rng or random.Random()
+
+    def index(self, difficulty):
+        words = word_pool.get(difficulty)
+        index = self._indexes.get(difficulty)
+        if index is None or index.words is not words:
+            with self._lock:
+                index = self._indexes.get(difficulty)
+                if index is None or index.words is not words:
+                    index = self._indexes[difficulty] = DifficultyIndex(words)
+        return index
+
+    def _view(self, game):
+        """``(length index, revealed letters, guessed(letter))`` of what a player sees in ``game``."""
+        index = self.index(game.difficulty).for_length(len(game.masked_word))
+        revealed = set(game.masked_word) - {'_'}
+
+        def guessed(letter):
+            bit = letter_bit(letter)
+            if bit:
+                return bool(game.guessed_letters & bit)
+            return letter in game.other_letters
+
+        return index, revealed, guessed
+
+    def best_letter(self, game):
+        """
+        The unguessed letter contained in the most dictionary words that still
+        fit ``game``, or None. Only the masked word and the guessed letters
+        are used, never the answer, so this is also what the hint endpoint
+        offers a human player.
+        """
+        index, revealed, guessed = self._view(game)
+        wrong = [letter for letter in index.letters if letter not in revealed and guessed(letter)]
+        return index.best_letter(index.candidates(game.masked_word, wrong), set(wrong) | revealed)
+
+    def choose(self, game):
+        """The letter the AI guesses next in ``game`` (a Game or engine state)."""
+        if self.random.random() < LEVELS.get(game.ai_level, 1.0):
+            letter = self.best_letter(game)
+            if letter is not None:
+                return letter
+
+        index, revealed, guessed = self._view(game)
+        unguessed = [letter for letter in index.letters if not guessed(letter)]
+        if unguessed:
+            return self.random.choice(unguessed)
+        # کلمه در واژه‌نامه نیست و همه‌ی حروف شناخته‌شده حدس زده شده‌اند
+        return next(letter for letter in game.word if letter not in revealed)
+
+
+ai_player = AIPlayer()
@@ -0,0 +1,163 @@
+"""
+ASGI-native versions of the hot game endpoints.
+
+They answer the same URLs with the same bodies as their APIView
+counterparts in api/views.py, but await the database through Django's async
+ORM instead of holding a worker thread. Enable them with API_ASYNC_VIEWS.
+Guesses still run in a thread (sync_to_async) because transactions and
+select_for_update are not available from async code; with
+GAME_ENGINE_ENABLED they go through the game engine like the sync view.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from api.authentication import CachedJWTAuthentication
+from api.engine import engine_snapshot, game_engine
+from api.guessing import GuessError, submit_guess
+from api.leaderboard import leaderboard_snapshots
+from api.letters import normalize_letter
+from api.models import Game
+from api.pagination import KeysetPagination
+from api.realtime import wait_for_game_change
+from api.fast_serializers import WAITING_GAME_VALUES, waiting_game_rows
+from api.views import GameStatusAPIView, LeaderboardAPIView, get_requested_fields
+
+
+jwt_authentication = CachedJWTAuthentication()
+
+
+async def authenticate(request):
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = jwt_authentication.get_validated_token(raw_token)
+        return await jwt_authentication.aget_user(token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def not_authenticated():
+    return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+
+def not_found():
+    return JsonResponse({'detail': 'No Game matches the given query.'}, status=404)
+
+
+@csrf_exempt
+@require_POST
+async def guess_letter(request, game_id):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        data = request.POST
+    letter = normalize_letter(str(data.get('letter', '')))
+    if not letter or len(letter) != 1 or not letter.isalpha():
+        return JsonResponse({'error': 'Invalid letter'}, status=400)
+
+    try:
+        if settings.GAME_ENGINE_ENABLED:
+            result = await sync_to_async(game_engine.guess)(game_id, user, letter)
+        else:
+            result = await sync_to_async(submit_guess)(game_id, user, letter)
+    except GuessError as e:
+        return JsonResponse({'error': e.message}, status=e.status)
+    except Http404:
+        return not_found()
+    return JsonResponse(result)
+
+
+@require_GET
+async def game_status(request, game_id):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+
+    state = engine_snapshot(game_id)
+    if state is not None:
+        game_row = {'version': state.version, 'player1_id': state.player1_id, 'player2_id': state.player2_id}
+    else:
+        game_row = await Game.objects.filter(id=game_id).values('version', 'player1_id', 'player2_id').afirst()
+        if game_row is None:
+            return not_found()
+    if not GameStatusAPIView.is_player(user, game_row):
+        return JsonResponse({'error': 'You are not part of this game'}, status=403)
+
+    known_version = GameStatusAPIView.get_known_version(request, game_id)
+    version = game_row['version']
+
+    wait = GameStatusAPIView.get_wait(request)
+    if wait and known_version == version:
+        version = await wait_for_game_change(game_id, known_version, wait)
+
+    if known_version is not None and version == known_version:
+        response = HttpResponse(status=304)
+        response['ETag'] = f'"{game_id}-{version}"'
+        return response
+
+    game = engine_snapshot(game_id)
+    if game is not None:
+        usernames = game.usernames
+    else:
+        game = await Game.objects.select_related('player1', 'player2').filter(id=game_id).afirst()
+        if game is None:
+            return not_found()
+        usernames = GameStatusAPIView.get_usernames(game)
+    response = JsonResponse(GameStatusAPIView.get_status_data(user, game, usernames))
+    response['ETag'] = game.etag
+    return response
+
+
+@require_GET
+async def waiting_games(request):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+
+    games = Game.objects.filter(
+        Q(status='waiting', player2__isnull=True) |
+        Q(status='active', player1=user) |
+        Q(status='active', player2=user)
+    ).values(*WAITING_GAME_VALUES)
+
+    drf_request = Request(request)
+    paginator = KeysetPagination('created_at')
+    try:
+        page = paginator.set_page([game async for game in paginator.get_page_queryset(games, drf_request)])
+    except APIException as e:
+        # مثل نسخه‌ی همگام: مکان نامعتبر صفحه ۴۰۴ است نه ۵۰۰
+        return JsonResponse({'detail': e.detail}, status=e.status_code)
+    return JsonResponse({
+        'next': paginator.get_next_link(),
+        'results': waiting_game_rows(page, get_requested_fields(drf_request)),
+    })
+
+
+@require_GET
+async def leaderboard_view(request):
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+
+    difficulty, period, error = LeaderboardAPIView.get_board(request)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    return JsonResponse(await sync_to_async(leaderboard_snapshots.get)(difficulty, period), safe=False)
@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+CACHED_USER_FIELDS = ('id', 'username', 'is_active')
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_users(user_ids):
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def cached_user_fields(user):
+    return [getattr(user, name) for name in CACHED_USER_FIELDS]
+
+
+def user_from_cache(values):
+    # بقیه‌ی فیلدها deferred هستند و در صورت نیاز از پایگاه داده خوانده می‌شوند
+    model = get_user_model()
+    fields = dict(zip(CACHED_USER_FIELDS, values))
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in fields]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the token's player id, username and active
+    flag in the cache for AUTH_USER_CACHE_SECONDS instead of loading the row
+    on every request. Other fields of a cached player are deferred, so views
+    that need them (score, level, ...) read them fresh from the database.
+
+    Cached players are dropped when a Player is saved or deleted (profile
+    edits, password changes, deactivation; see api.signals). The TTL bounds
+    how stale a player can be in workers that do not share the cache.
+    """
+
+    @property
+    def timeout(self):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # بررسی ابطال توکن به hash رمز تازه نیاز دارد
+            return 0
+        return getattr(settings, 'AUTH_USER_CACHE_SECONDS', 60)
+
+    def get_cache_key(self, validated_token):
+        try:
+            return user_cache_key(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+    def get_user(self, validated_token):
+        if not self.timeout:
+            return super().get_user(validated_token)
+        key = self.get_cache_key(validated_token)
+        values = cache.get(key)
+        if values is not None:
+            return user_from_cache(values)
+        user = super().get_user(validated_token)
+        cache.set(key, cached_user_fields(user), self.timeout)
+        return user
+
+    async def aget_user(self, validated_token):
+        if not self.timeout:
+            return await sync_to_async(super().get_user)(validated_token)
+        key = self.get_cache_key(validated_token)
+        values = await cache.aget(key)
+        if values is not None:
+            return user_from_cache(values)
+        user = await sync_to_async(super().get_user)(validated_token)
+        await cache.aset(key, cached_user_fields(user), self.timeout)
+        return user
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    # نسخه‌ی جدول‌های امتیاز، مخزن کلمه‌ها و کاربرهای کش‌شده فقط از طریق این کش بین پردازه‌ها جابه‌جا می‌شوند
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            'The default cache is local to each process.',
+            hint='Leaderboard snapshots, the word pool and cached users are then '
+                 'not invalidated across workers; configure a shared cache (CACHE_URL).',
+            id='api.W001',
+        )]
+    return []
@@ -0,0 +1,252 @@
+"""
+Optional in-memory game state engine with write-behind persistence.
+
+With GAME_ENGINE_ENABLED the guess endpoint applies moves to game state held
+in memory, using the same rules as api.guessing, and answers without touching
+the database. Changed games, new Guess rows and end-of-game player updates
+are flushed in batches by a background thread every
+GAME_ENGINE_FLUSH_INTERVAL seconds, or sooner once GAME_ENGINE_BATCH_SIZE
+guesses are pending.
+
+State is kept per process in lock-striped shards keyed by game id, so every
+request for a game must reach the same process (one worker, or routing by
+game id). A flush whose Game version no longer matches the database means
+another process changed the game; that state is dropped and reloaded.
+
+Games are loaded from their Game row and the Guess log is replayed on top
+of it, so guesses flushed before a crash are never lost even if the Game
+row itself was not updated.
+"""
+
+import atexit
+import copy
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from api.guessing import (
+    GuessError, ai_result, apply_guess, check_guess, finish_game, guess_result, play_ai_turns,
+)
+from api.models import Game, Guess, Player
+from api.realtime import publish_game
+
+
+logger = logging.getLogger(__name__)
+
+
+class GameState:
+    __slots__ = (
+        'id', 'player1_id', 'player2_id', 'ai_level', 'word', 'masked_word', 'difficulty',
+        'player1_score', 'player2_score', 'status', 'turn_id', 'guessed_letters', 'finished_at',
+        'other_letters', 'version', 'persisted_version', 'usernames', 'finished_pending',
+    )
+
+    @classmethod
+    def from_game(cls, game, guesses, usernames):
+        state = cls()
+        state.id = game.id
+        state.player1_id = game.player1_id
+        state.player2_id = game.player2_id
+        state.ai_level = game.ai_level
+        state.word = game.word
+        state.difficulty = game.difficulty
+        state.status = game.status
+        state.finished_at = game.finished_at
+        state.version = state.persisted_version = game.version
+        state.usernames = usernames
+        state.finished_pending = False
+
+        # وضعیت بازی از روی لاگ حدس‌ها بازسازی می‌شود
+        state.masked_word = '_' * len(game.word)
+        state.player1_score = state.player2_score = 0
+        state.guessed_letters = 0
+        state.other_letters = ''
+        state.turn_id = guesses[0][0] if guesses else game.turn_id
+        for player_id, letter in guesses:
+            apply_guess(state, player_id, letter)
+        if not guesses:
+            state.masked_word = game.masked_word
+            state.player1_score = game.player1_score
+            state.player2_score = game.player2_score
+        elif state.status == 'active' and game.status in ('paused', 'finished'):
+            # توقف و لغو بازی در لاگ حدس‌ها ثبت نمی‌شوند
+            state.status = game.status
+        if game.finished_at is not None:
+            state.finished_at = game.finished_at
+        if state.status != game.status or state.masked_word != game.masked_word:
+            # ردیف Game از لاگ عقب‌تر بوده است؛ در flush بعدی درست می‌شود
+            state.persisted_version = -1
+            state.version += 1
+            state.finished_pending = state.status == 'finished' and game.status != 'finished'
+        return state
+
+    @property
+    def etag(self):
+        return f'"{self.id}-{self.version}"'
+
+
+class GameEngine:
+    def __init__(self, shards=16):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._pending_guesses = []
+        self._dirty = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'GAME_ENGINE_FLUSH_INTERVAL', 0.5)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'GAME_ENGINE_BATCH_SIZE', 500)
+
+    def _shard(self, game_id):
+        return self._shards[game_id % len(self._shards)]
+
+    def _load(self, game_id):
+        game = Game.objects.filter(id=game_id).first()
+        if game is None:
+            return None
+        guesses = list(Guess.objects.filter(game_id=game_id).order_by('id').values_list('player_id', 'letter'))
+        usernames = dict(Player.objects.filter(
+            pk__in=[game.player1_id, game.player2_id]
+        ).values_list('id', 'username'))
+        return GameState.from_game(game, guesses, usernames)
+
+    def guess(self, game_id, player, letter):
+        games, lock = self._shard(game_id)
+        with lock:
+            state = games.get(game_id)
+            if state is None:
+                state = self._load(game_id)
+                if state is None:
+                    raise GuessError('No Game matches the given query.', status=404)
+                games[game_id] = state
+
+            check_guess(state, player.id, letter)
+            correct = apply_guess(state, player.id, letter)
+            guesses = [Guess(game_id=game_id, player_id=player.id, letter=letter, correct=correct)]
+            ai_moves = play_ai_turns(state)
+            for ai_letter, ai_correct in ai_moves:
+                guesses.append(Guess(game_id=game_id, player_id=None, letter=ai_letter, correct=ai_correct))
+            state.version += 1
+            if state.status == 'finished':
+                state.finished_pending = True
+
+            with self._pending_lock:
+                self._pending_guesses.extend(guesses)
+                self._dirty[game_id] = state
+                pending = len(self._pending_guesses)
+
+            result = ai_result(guess_result(state, player.id, correct, state.usernames), ai_moves)
+            publish_game(state, state.usernames)
+
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return result
+
+    def snapshot(self, game_id):
+        """A copy of the state of ``game_id`` for read-only use, or None if the engine does not hold it."""
+        games, lock = self._shard(game_id)
+        with lock:
+            state = games.get(game_id)
+            if state is None:
+                return None
+            return copy.copy(state)
+
+    def release(self, game_id):
+        """Flush and forget a game before code outside the engine changes it."""
+        games, lock = self._shard(game_id)
+        with lock:
+            if game_id not in games:
+                return
+        self.flush()
+        with lock:
+            games.pop(game_id, None)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._pending_lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(target=self._run_flusher, name='game-engine-flusher', daemon=True)
+                    self._flusher.start()
+
+    def _run_flusher(self):
+        from django.db import close_old_connections
+
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Game engine flush failed')
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._pending_lock:
+                guesses, self._pending_guesses = self._pending_guesses, []
+                dirty, self._dirty = self._dirty, {}
+            if not guesses and not dirty:
+                return
+
+            snapshots = []
+            for game_id, state in dirty.items():
+                games, lock = self._shard(game_id)
+                with lock:
+                    snapshots.append((state, {
+                        'masked_word': state.masked_word,
+                        'player1_score': state.player1_score,
+                        'player2_score': state.player2_score,
+                        'status': state.status,
+                        'turn_id': state.turn_id,
+                        'guessed_letters': state.guessed_letters,
+                        'other_letters': state.other_letters,
+                        'finished_at': state.finished_at,
+                        'version': state.version,
+                    }, state.persisted_version, state.finished_pending))
+                    state.finished_pending = False
+
+            conflicts = set()
+            with transaction.atomic():
+                for state, values, persisted_version, finished in snapshots:
+                    games = Game.objects.filter(pk=state.id)
+                    if persisted_version >= 0:
+                        games = games.filter(version=persisted_version)
+                    if not games.update(**values):
+                        conflicts.add(state.id)
+                        continue
+                    if finished:
+                        finish_game(state)
+
+                Guess.objects.bulk_create(
+                    [guess for guess in guesses if guess.game_id not in conflicts], batch_size=self.batch_size
+                )
+
+            for state, values, _, _ in snapshots:
+                games, lock = self._shard(state.id)
+                with lock:
+                    if state.id in conflicts:
+                        logger.error('Game #%s was changed outside the game engine; dropping its state', state.id)
+                        games.pop(state.id, None)
+                    else:
+                        state.persisted_version = values['version']
+                        if state.status == 'finished' and state.version == values['version']:
+                            games.pop(state.id, None)
+
+
+game_engine = GameEngine(shards=getattr(settings, 'GAME_ENGINE_SHARDS', 16))
+atexit.register(game_engine.flush)
+
+
+def engine_snapshot(game_id):
+    """The engine's copy of ``game_id`` when GAME_ENGINE_ENABLED and the engine holds the game, else None."""
+    return game_engine.snapshot(game_id) if settings.GAME_ENGINE_ENABLED else None
@@ -0,0 +1,104 @@
+"""
+Plain dict builders for the high-frequency game shapes.
+
+They produce exactly what GameSerializer, WaitingGameSerializer and
+GameHistorySerializer produce, but from ``.values()`` rows (or a loaded
+Game) without per-field serializer machinery, and with the requesting
+player's id looked up once per request instead of once per field.
+"""
+
+from django.utils import timezone
+
+
+WAITING_GAME_VALUES = ('id', 'player1__username', 'difficulty', 'created_at', 'status', 'word')
+HISTORY_VALUES = (
+    'id', 'difficulty', 'status', 'masked_word', 'started_at', 'player1_id', 'player2_id',
+    'player1_score', 'player2_score', 'player1__username', 'player2__username', 'ai_level',
+)
+
+
+def format_datetime(value):
+    """DRF's default ISO 8601 DateTimeField output."""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def project(rows, fields):
+    if not fields:
+        return rows
+    return [{name: value for name, value in row.items() if name in fields} for row in rows]
+
+
+def game_data(game):
+    """GameSerializer output for a Game with player1, player2 and turn loaded."""
+    return {
+        'id': game.id,
+        'player1': game.player1.username,
+        'player2': game.player2.username if game.player2_id else None,
+        'masked_word': game.masked_word,
+        'difficulty': game.difficulty,
+        'status': game.status,
+        'created_at': format_datetime(game.created_at),
+        'started_at': format_datetime(game.started_at),
+        'current_turn': game.turn.username if game.turn_id else None,
+        'player1_score': game.player1_score,
+        'player2_score': game.player2_score if game.player2_id or game.ai_level else 0,
+    }
+
+
+def waiting_game_rows(rows, fields=None):
+    """WaitingGameSerializer output for ``.values(*WAITING_GAME_VALUES)`` rows."""
+    return project([
+        {
+            'id': row['id'],
+            'player1': row['player1__username'],
+            'difficulty': row['difficulty'],
+            'created_at': format_datetime(row['created_at']),
+            'status': row['status'],
+            'word_length': len(row['word']),
+        }
+        for row in rows
+    ], fields)
+
+
+def history_rows(rows, user_id, fields=None):
+    """GameHistorySerializer output for ``.values(*HISTORY_VALUES)`` rows seen by ``user_id``."""
+    data = []
+    for row in rows:
+        player1_score, player2_score = row['player1_score'], row['player2_score']
+        if row['player1_id'] == user_id:
+            opponent = row['player2__username'] if row['player2_id'] else 'AI'
+            your_score, opponent_score = player1_score, (player2_score if row['player2_id'] or row['ai_level'] else 0)
+        else:
+            opponent = row['player1__username']
+            if row['player2_id'] == user_id:
+                your_score, opponent_score = player2_score, player1_score
+            else:
+                your_score = opponent_score = 0
+
+        result = None
+        if row['status'] == 'finished':
+            if player1_score > player2_score:
+                result = 'win' if user_id == row['player1_id'] else 'lose'
+            elif player2_score > player1_score:
+                result = 'win' if user_id == row['player2_id'] else 'lose'
+            else:
+                result = 'draw'
+
+        started_at = row['started_at']
+        data.append({
+            'id': row['id'],
+            'difficulty': row['difficulty'],
+            'status': row['status'],
+            'masked_word': row['masked_word'],
+            'started_at': timezone.localtime(started_at).strftime('%Y-%m-%d %H:%M:%S') if started_at else None,
+            'opponent': opponent,
+            'result': result,
+            'your_score': your_score,
+            'opponent_score': opponent_score,
+        })
+    return project(data, fields)
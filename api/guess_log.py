@@ -0,0 +1,93 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+
+from api.models import Guess
+
+
+logger = logging.getLogger(__name__)
+
+
+class GuessLogWriter:
+    """
+    Writes the append-only Guess audit log.
+
+    In the default ``sync`` mode each guess is inserted inside the guess
+    transaction. In ``batch`` mode guesses are buffered after the transaction
+    commits and inserted with bulk_create once GUESS_LOG_BATCH_SIZE rows are
+    waiting or GUESS_LOG_FLUSH_INTERVAL seconds have passed; the live game
+    state never reads this table, so the delay is only visible in the log.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def mode(self):
+        return getattr(settings, 'GUESS_LOG_MODE', 'sync')
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'GUESS_LOG_BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'GUESS_LOG_FLUSH_INTERVAL', 1.0)
+
+    def write(self, guess):
+        if self.mode != 'batch':
+            guess.save()
+            return
+        transaction.on_commit(lambda: self._append(guess))
+
+    def write_many(self, guesses):
+        if self.mode != 'batch':
+            Guess.objects.bulk_create(guesses, batch_size=self.batch_size)
+            return
+        transaction.on_commit(lambda: self._append(*guesses))
+
+    def _append(self, *guesses):
+        with self._lock:
+            self._buffer.extend(guesses)
+            full = len(self._buffer) >= self.batch_size
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            guesses, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not guesses:
+            return
+        try:
+            try:
+                with transaction.atomic():
+                    Guess.objects.bulk_create(guesses, batch_size=self.batch_size)
+            except IntegrityError:
+                # یک ردیف تکراری نباید بقیه‌ی دسته را از بین ببرد
+                logger.warning('Duplicate rows in a guess log batch of %s; skipping them', len(guesses))
+                Guess.objects.bulk_create(guesses, batch_size=self.batch_size, ignore_conflicts=True)
+        except DatabaseError:
+            logger.exception('Writing %s guesses to the log failed; retrying later', len(guesses))
+            with self._lock:
+                self._buffer[:0] = guesses
+                self._schedule()
+
+
+guess_log = GuessLogWriter()
+atexit.register(guess_log.flush)
@@ -0,0 +1,313 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Mod
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from api.ai import ai_player
+from api.guess_log import guess_log
+from api.leaderboard import leaderboard, leaderboard_snapshots
+from api.letters import letter_bit, reveal
+from api.models import Game, GameFinishTask, Guess, MatchTicket, Player, PlayerStats
+from api.realtime import publish_game
+from api.tasks import background_tasks
+
+
+CORRECT_GUESS_POINTS = 20
+XP_PER_LEVEL = 100
+
+
+class GuessError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def award_players(game):
+    """
+    Add the game's scores to both players' totals and XP.
+
+    Done with F() expressions so concurrent games finishing for the same
+    player never overwrite each other; every XP_PER_LEVEL xp is one level.
+    """
+    for player_id, gained in ((game.player1_id, game.player1_score), (game.player2_id, game.player2_score)):
+        if player_id is None:
+            continue
+        Player.objects.filter(pk=player_id).update(
+            score=F('score') + gained,
+            level=F('level') + (F('xp') + gained) / XP_PER_LEVEL,
+            xp=Mod(F('xp') + gained, XP_PER_LEVEL),
+        )
+
+
+def refresh_leaderboard(player_ids, game=None):
+    for player in Player.objects.filter(pk__in=player_ids).only('id', 'score', 'xp'):
+        leaderboard.update(player)
+    if game is not None:
+        leaderboard_snapshots.refresh(player_ids, game.difficulty, game.finished_at)
+
+
+def finish_game(game):
+    """
+    Do or schedule the end-of-game work of ``game`` inside the transaction
+    that finished it. With GAME_FINISH_MODE ``background`` it is recorded as
+    a GameFinishTask and done by api.tasks once that transaction commits, so
+    the finishing guess answers as fast as any other; otherwise it is done
+    right here.
+    """
+    if getattr(settings, 'GAME_FINISH_MODE', 'sync') == 'background':
+        GameFinishTask.objects.bulk_create([GameFinishTask(game_id=game.id)], ignore_conflicts=True)
+        transaction.on_commit(lambda: background_tasks.submit(run_finish_task, game.id))
+    else:
+        # فقط یک تراکنش می‌تواند بازی را تمام کند، پس ردیف GameFinishTask لازم نیست
+        apply_finish(game)
+
+
+def apply_finish(game):
+    award_players(game)
+    PlayerStats.record_game(game)
+    MatchTicket.objects.filter(game_id=game.id).delete()
+    player_ids = [player_id for player_id in (game.player1_id, game.player2_id) if player_id]
+    transaction.on_commit(lambda: refresh_leaderboard(player_ids, game))
+
+
+def run_finish_task(game_id, game=None):
+    """
+    Award the players of a finished game, count it in their stats, close
+    its match tickets and refresh the leaderboard, unless that was done already; returns whether
+    it ran. The task is claimed with a conditional UPDATE, so a worker and
+    the run_finish_tasks command never both apply it.
+    """
+    try:
+        with transaction.atomic():
+            claimed = GameFinishTask.objects.filter(game_id=game_id, done_at__isnull=True).update(
+                done_at=timezone.now(), attempts=F('attempts') + 1,
+            )
+            if not claimed:
+                return False
+            if game is None:
+                game = Game.objects.get(pk=game_id)
+            apply_finish(game)
+    except Exception as e:
+        # داخل تراکنش بیرونی، خطا همراه با کل تراکنش برگردانده می‌شود
+        if not transaction.get_connection().in_atomic_block:
+            GameFinishTask.objects.filter(game_id=game_id, done_at__isnull=True).update(
+                attempts=F('attempts') + 1, last_error=repr(e)[:1000],
+            )
+        raise
+    return True
+
+
+def check_guess(game, player_id, letter):
+    """Raise GuessError if ``player_id`` may not guess ``letter`` now."""
+    if game.status != 'active':
+        raise GuessError('Game is not active')
+
+    if game.turn_id != player_id:
+        raise GuessError('It is not your turn', status=403)
+
+    bit = letter_bit(letter)
+    if bit:
+        already_guessed = game.guessed_letters & bit
+    else:
+        # حروف خارج از الفبا بیت ندارند و جداگانه نگه داشته می‌شوند
+        already_guessed = letter in game.other_letters
+    if already_guessed:
+        raise GuessError('Letter already guessed')
+
+
+def apply_guess(game, player_id, letter):
+    """
+    Apply a checked guess to ``game`` in memory and return whether it was
+    correct. ``game`` is a Game or any object with the same state attributes.
+    """
+    masked_word, correct = reveal(game.word, game.masked_word, letter)
+
+    is_player1 = game.player1_id == player_id
+    if correct:
+        if is_player1:
+            game.player1_score += CORRECT_GUESS_POINTS
+        else:
+            game.player2_score += CORRECT_GUESS_POINTS
+    else:
+        if is_player1:
+            game.player1_score = max(0, game.player1_score - CORRECT_GUESS_POINTS)
+        else:
+            game.player2_score = max(0, game.player2_score - CORRECT_GUESS_POINTS)
+
+    game.masked_word = masked_word
+    bit = letter_bit(letter)
+    if bit:
+        game.guessed_letters |= bit
+    else:
+        game.other_letters += letter
+
+    if masked_word == game.word:
+        game.status = 'finished'
+        game.finished_at = timezone.now()
+        if game.player1_score > game.player2_score:
+            game.turn_id = game.player1_id  # برنده بازی
+        elif game.player2_score > game.player1_score:
+            game.turn_id = game.player2_id
+        else:
+            game.turn_id = None  # مساوی
+    else:
+        game.turn_id = game.player2_id if game.turn_id == game.player1_id else game.player1_id
+
+    return correct
+
+
+def play_ai_turns(game):
+    """
+    Let the AI of a single-player game move while it is its turn; it plays
+    as player2 with no Player (``player_id`` None). Returns its moves as
+    ``[(letter, correct)]``, already applied to ``game``.
+    """
+    moves = []
+    while game.ai_level and game.status == 'active' and game.turn_id is None:
+        letter = ai_player.choose(game)
+        moves.append((letter, apply_guess(game, None, letter)))
+    return moves
+
+
+def ai_result(result, moves):
+    """Add the AI's reply to a guess result."""
+    if moves:
+        result['ai_guesses'] = [{'letter': letter, 'correct': correct} for letter, correct in moves]
+    return result
+
+
+def guess_result(game, player_id, correct, usernames):
+    turn_username = usernames.get(game.turn_id)
+    if game.status == 'finished' and game.ai_level and game.player2_score > game.player1_score:
+        turn_username = 'AI'
+    return {
+        'masked_word': game.masked_word,
+        'correct': correct,
+        'next_turn': turn_username if game.status != 'finished' else None,
+        'game_status': game.status,
+        'your_score': game.player1_score if game.player1_id == player_id else game.player2_score,
+        'player1_score': game.player1_score,
+        'player2_score': game.player2_score,
+        'winner': turn_username if game.status == 'finished' else None,
+    }
+
+
+def submit_guess(game_id, player, letter):
+    """
+    Apply ``letter`` guessed by ``player`` to the game as one atomic unit.
+
+    The game row is locked with SELECT ... FOR UPDATE where the database
+    supports it, and the write is a conditional UPDATE on the version read,
+    so a concurrent move that got there first makes this one fail with a
+    409 instead of silently overwriting it.
+    """
+    with transaction.atomic():
+        game = get_object_or_404(Game.objects.select_for_update(), id=game_id)
+        check_guess(game, player.id, letter)
+
+        read_version = game.version
+        correct = apply_guess(game, player.id, letter)
+        ai_moves = play_ai_turns(game)
+
+        updated = Game.objects.filter(
+            pk=game.pk, version=read_version, status='active', turn_id=player.id
+        ).update(
+            masked_word=game.masked_word,
+            player1_score=game.player1_score,
+            player2_score=game.player2_score,
+            status=game.status,
+            turn_id=game.turn_id,
+            guessed_letters=game.guessed_letters,
+            other_letters=game.other_letters,
+            finished_at=game.finished_at,
+            version=F('version') + 1,
+        )
+        if not updated:
+            raise GuessError('The game was changed by another move, please retry', status=409)
+        game.version += 1
+
+        if ai_moves:
+            guess_log.write_many([Guess(game=game, player=player, letter=letter, correct=correct)] + [
+                Guess(game=game, player=None, letter=ai_letter, correct=ai_correct) for ai_letter, ai_correct in ai_moves
+            ])
+        else:
+            guess_log.write(Guess(game=game, player=player, letter=letter, correct=correct))
+
+        if game.status == 'finished':
+            finish_game(game)
+
+        usernames = dict(Player.objects.filter(
+            pk__in=[game.player1_id, game.player2_id]
+        ).values_list('id', 'username'))
+        publish_game(game, usernames)
+
+    return ai_result(guess_result(game, player.id, correct, usernames), ai_moves)
+
+
+def submit_guesses(player, moves):
+    """
+    Apply ``moves``, an ordered list of ``(game_id, letter)`` guessed by
+    ``player``, in one transaction.
+
+    Every move is checked against the state left by the moves before it, and
+    a move that breaks the rules is answered with an error without stopping
+    the others. Guess rows are bulk inserted and every changed game is
+    written with a single conditional UPDATE. Returns one result per move:
+    the same dict as submit_guess, or ``{'error': ..., 'status': ...}``.
+    """
+    with transaction.atomic():
+        games = Game.objects.select_for_update().in_bulk({game_id for game_id, _ in moves})
+        read_versions = {game_id: game.version for game_id, game in games.items()}
+        usernames = dict(Player.objects.filter(
+            pk__in={player_id for game in games.values() for player_id in (game.player1_id, game.player2_id)}
+        ).values_list('id', 'username'))
+
+        results = []
+        guesses = []
+        for game_id, letter in moves:
+            game = games.get(game_id)
+            if game is None:
+                results.append({'error': 'No Game matches the given query.', 'status': 404})
+                continue
+            try:
+                check_guess(game, player.id, letter)
+            except GuessError as e:
+                results.append({'error': e.message, 'status': e.status})
+                continue
+
+            correct = apply_guess(game, player.id, letter)
+            guesses.append(Guess(game=game, player=player, letter=letter, correct=correct))
+            ai_moves = play_ai_turns(game)
+            for ai_letter, ai_correct in ai_moves:
+                guesses.append(Guess(game=game, player=None, letter=ai_letter, correct=ai_correct))
+            game.version += 1
+            results.append(ai_result(guess_result(game, player.id, correct, usernames), ai_moves))
+
+        changed = [game for game in games.values() if game.version != read_versions[game.id]]
+        for game in changed:
+            updated = Game.objects.filter(pk=game.pk, version=read_versions[game.id]).update(
+                masked_word=game.masked_word,
+                player1_score=game.player1_score,
+                player2_score=game.player2_score,
+                status=game.status,
+                turn_id=game.turn_id,
+                guessed_letters=game.guessed_letters,
+                other_letters=game.other_letters,
+                finished_at=game.finished_at,
+                version=game.version,
+            )
+            if not updated:
+                raise GuessError('The game was changed by another move, please retry', status=409)
+
+        guess_log.write_many(guesses)
+
+        for game in changed:
+            if game.status == 'finished':
+                finish_game(game)
+            publish_game(game, usernames)
+
+    return results
+
@@ -0,0 +1,371 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from api.models import ArchivedGame, Game, Player
+
+
+GENERATION_CACHE_KEY = 'leaderboard:generation'
+CHANGES_CACHE_KEY = 'leaderboard:changes'
+CHANGE_LOG_MAX_REPLAY = 1000
+SNAPSHOT_GENERATION_CACHE_KEY = 'leaderboard:snapshot:generation'
+SNAPSHOT_PERIODS = ('all', 'daily', 'weekly')
+
+
+class RankIndex:
+    """
+    Ordered index of players by (-score, -xp, id).
+
+    Rank and top-N lookups are binary searches / slices over a sorted list, so
+    they never touch the Player table once the index is loaded.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._by_player = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(player_id, score, xp):
+        return (-score, -xp, player_id)
+
+    def load(self, rows):
+        keys = [self.make_key(player_id, score, xp) for player_id, score, xp in rows]
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._by_player = {key[2]: key for key in keys}
+
+    def update(self, player_id, score, xp):
+        key = self.make_key(player_id, score, xp)
+        with self._lock:
+            old = self._by_player.get(player_id)
+            if old == key:
+                return
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+            insort(self._keys, key)
+            self._by_player[player_id] = key
+
+    def remove(self, player_id):
+        with self._lock:
+            old = self._by_player.pop(player_id, None)
+            if old is not None:
+                del self._keys[bisect_left(self._keys, old)]
+
+    def rank(self, player_id):
+        with self._lock:
+            key = self._by_player.get(player_id)
+            if key is None:
+                return None
+            return bisect_left(self._keys, key) + 1
+
+    def top(self, n):
+        with self._lock:
+            return [(rank, -key[0], -key[1], key[2]) for rank, key in enumerate(self._keys[:n], start=1)]
+
+    def __contains__(self, player_id):
+        return player_id in self._by_player
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class Leaderboard:
+    """
+    Process-wide RankIndex that is loaded lazily from Player.score/xp.
+
+    Every worker keeps its own copy. Score changes are applied to it and
+    appended to a change log in the cache (see CACHES), whose entries are
+    numbered by a counter; before each read a worker replays the entries it
+    has not seen, so other workers' changes show up without reloading the
+    Player table. ``rebuild_leaderboard`` bumps a generation number that
+    makes every worker sharing the cache reload. A worker also reloads when
+    it may have missed entries: after LEADERBOARD_CHANGE_LOG_SECONDS (how
+    long entries are kept) without reading the log, or when it is more than
+    CHANGE_LOG_MAX_REPLAY entries behind.
+    """
+
+    def __init__(self):
+        self.index = RankIndex()
+        self._generation = None
+        self._change = 0
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def change_log_seconds(self):
+        return getattr(settings, 'LEADERBOARD_CHANGE_LOG_SECONDS', 3600)
+
+    def _needs_reload(self, generation, latest):
+        return (
+            self._synced_at is None
+            or generation != self._generation
+            or not 0 <= latest - self._change <= CHANGE_LOG_MAX_REPLAY
+            or time.monotonic() - self._synced_at > self.change_log_seconds
+        )
+
+    def ensure_loaded(self):
+        shared = cache.get_many([GENERATION_CACHE_KEY, CHANGES_CACHE_KEY])
+        generation, latest = shared.get(GENERATION_CACHE_KEY, 0), shared.get(CHANGES_CACHE_KEY, 0)
+        if latest == self._change and not self._needs_reload(generation, latest):
+            self._synced_at = time.monotonic()
+            return self.index
+        with self._lock:
+            if self._needs_reload(generation, latest):
+                self.reload()
+            elif latest > self._change:
+                self._replay(latest)
+        return self.index
+
+    def reload(self):
+        # شماره‌ی تغییرها پیش از خواندن جدول گرفته می‌شود تا تغییرهای هم‌زمان دوباره اعمال شوند
+        shared = cache.get_many([GENERATION_CACHE_KEY, CHANGES_CACHE_KEY])
+        self.index.load(Player.objects.values_list('id', 'score', 'xp').iterator(chunk_size=5000))
+        self._generation = shared.get(GENERATION_CACHE_KEY, 0)
+        self._change = shared.get(CHANGES_CACHE_KEY, 0)
+        self._synced_at = time.monotonic()
+
+    def _replay(self, latest):
+        numbers = range(self._change + 1, latest + 1)
+        changes = cache.get_many([f'{CHANGES_CACHE_KEY}:{number}' for number in numbers])
+        for number in numbers:
+            change = changes.get(f'{CHANGES_CACHE_KEY}:{number}')
+            if change is None:
+                # هنوز نوشته نشده است؛ خواندن بعدی دوباره امتحان می‌کند
+                return
+            player_id, score, xp = change
+            if score is None:
+                self.index.remove(player_id)
+            else:
+                self.index.update(player_id, score, xp)
+            self._change = number
+        self._synced_at = time.monotonic()
+
+    def _log(self, player_id, score=None, xp=None):
+        for _ in range(3):
+            try:
+                number = cache.incr(CHANGES_CACHE_KEY)
+            except ValueError:
+                cache.add(CHANGES_CACHE_KEY, 0, None)
+                continue
+            # incr در کش فایلی اتمی نیست؛ شماره‌ای که نویسنده‌ی دیگری گرفته دوباره نوشته نمی‌شود
+            if cache.add(f'{CHANGES_CACHE_KEY}:{number}', (player_id, score, xp), self.change_log_seconds):
+                return
+
+    def invalidate(self):
+        try:
+            cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            cache.set(GENERATION_CACHE_KEY, 1, None)
+        self._synced_at = None
+
+    def update(self, player):
+        self.ensure_loaded().update(player.id, player.score, player.xp)
+        self._log(player.id, player.score, player.xp)
+
+    def remove(self, player_id):
+        self.index.remove(player_id)
+        self._log(player_id)
+
+    def rank(self, player):
+        # بازیکن تازه از دیتابیس خوانده شده و از نمایه جلوتر است
+        index = self.ensure_loaded()
+        index.update(player.id, player.score, player.xp)
+        return index.rank(player.id)
+
+    def top(self, n=10):
+        return self.ensure_loaded().top(n)
+
+
+def format_win_rate(games, wins):
+    if not games:
+        return '0%'
+    return f'{round((wins / games) * 100, 2)}%'
+
+
+def scoped_totals(difficulty, since, player_ids=None):
+    """
+    ``{player_id: (score, games, wins)}`` over finished games, live and
+    archived, of a difficulty and/or since a time.
+    """
+    totals = {}
+    for games, side, other in (
+        (Game.objects.filter(status='finished'), 'player1', 'player2'),
+        (Game.objects.filter(status='finished'), 'player2', 'player1'),
+        (ArchivedGame.objects.all(), 'player1', 'player2'),
+        (ArchivedGame.objects.all(), 'player2', 'player1'),
+    ):
+        if difficulty is not None:
+            games = games.filter(difficulty=difficulty)
+        if since is not None:
+            games = games.filter(finished_at__gte=since)
+        rows = games.order_by().filter(**{f'{side}__isnull': False})
+        if player_ids is not None:
+            rows = rows.filter(**{f'{side}__in': player_ids})
+        rows = rows.values(side).annotate(
+            score=Sum(f'{side}_score'),
+            games=Count('id'),
+            wins=Count('id', filter=Q(**{f'{side}_score__gt': F(f'{other}_score')})),
+        )
+        for row in rows:
+            score, games_played, wins = totals.get(row[side], (0, 0, 0))
+            totals[row[side]] = (score + row['score'], games_played + row['games'], wins + row['wins'])
+    return totals
+
+
+class LeaderboardSnapshots:
+    """
+    Top-N boards (rank, score, level, xp, win rate) kept in the cache.
+
+    Besides the overall board there is one per difficulty and per day/week,
+    scored over the finished games of that scope. Each board lives under a
+    key ending in its version number; a finished game patches only the
+    boards it can change, and only when one of its players is on the board
+    or now beats its last entry, by writing the patched board under the next
+    version. Readers fetch the current version and reuse their in-process
+    copy while it has not moved.
+    """
+
+    def __init__(self, leaderboard):
+        self.leaderboard = leaderboard
+        self._local = {}
+
+    @property
+    def size(self):
+        return getattr(settings, 'LEADERBOARD_SIZE', 10)
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'LEADERBOARD_SNAPSHOT_TIMEOUT', 60)
+
+    @staticmethod
+    def window_start(period, when=None):
+        if period == 'all':
+            return None
+        day = timezone.localdate(when)
+        if period == 'weekly':
+            day -= timedelta(days=day.weekday())
+        return day
+
+    def _base_key(self, difficulty, period, start):
+        generation = cache.get(SNAPSHOT_GENERATION_CACHE_KEY, 0)
+        window = start.isoformat() if start else '-'
+        return f'leaderboard:snapshot:{generation}:{period}:{window}:{difficulty or "all"}'
+
+    def _version(self, base_key, create=True):
+        version = cache.get(f'{base_key}:version')
+        if version is None and create:
+            # شماره نسخه تازه نباید با نسخه‌های قدیمی‌تر یکی شود
+            cache.add(f'{base_key}:version', time.time_ns(), None)
+            version = cache.get(f'{base_key}:version')
+        return version
+
+    def get(self, difficulty=None, period='all'):
+        start = self.window_start(period)
+        base_key = self._base_key(difficulty, period, start)
+        key = f'{base_key}:{self._version(base_key)}'
+        rows = self._local.get(key)
+        if rows is None:
+            rows = cache.get(key)
+            if rows is None:
+                rows = self._rows(difficulty, start)
+                cache.set(key, rows, self.timeout)
+            if len(self._local) > 256:
+                self._local.clear()
+            self._local[key] = rows
+        return [entry for _, entry in rows]
+
+    def _rows(self, difficulty, start, player_ids=None):
+        """
+        Ranked ``(sort_key, entry)`` rows of the top N, or of ``player_ids``
+        (ranks then only matter relative to each other).
+        """
+        if difficulty is None and start is None:
+            if player_ids is None:
+                player_ids = [player_id for _, _, _, player_id in self.leaderboard.top(self.size)]
+            rows = []
+            for player in Player.objects.select_related('stats').filter(pk__in=player_ids):
+                stats = getattr(player, 'stats', None)
+                rows.append(((-player.score, -player.xp, player.id), player, player.score,
+                             stats.games_played if stats else 0, stats.wins if stats else 0))
+        else:
+            since = timezone.make_aware(datetime.combine(start, datetime.min.time())) if start else None
+            totals = scoped_totals(difficulty, since, player_ids)
+            ranked = sorted((-score, -wins, player_id) for player_id, (score, _, wins) in totals.items())
+            if player_ids is None:
+                ranked = ranked[:self.size]
+            players = Player.objects.only('id', 'username', 'level', 'xp').in_bulk([key[2] for key in ranked])
+            rows = [(key, players[key[2]], *totals[key[2]]) for key in ranked if key[2] in players]
+
+        rows.sort(key=lambda row: row[0])
+        return [
+            (sort_key, {
+                'id': player.id,
+                'username': player.username,
+                'score': score,
+                'level': player.level,
+                'xp': player.xp,
+                'win_rate': format_win_rate(games, wins),
+                'rank': rank,
+            })
+            for rank, (sort_key, player, score, games, wins) in enumerate(rows, start=1)
+        ]
+
+    def refresh(self, player_ids, difficulty=None, finished_at=None):
+        """
+        Patch the cached boards that ``player_ids`` can appear on: the overall
+        board, plus those of ``difficulty`` and the day and week of
+        ``finished_at`` when a game finished.
+        """
+        boards = [(None, 'all', None)]
+        if finished_at is not None:
+            boards.append((difficulty, 'all', None))
+            for period in ('daily', 'weekly'):
+                start = self.window_start(period, finished_at)
+                boards += [(None, period, start), (difficulty, period, start)]
+
+        for difficulty, period, start in boards:
+            base_key = self._base_key(difficulty, period, start)
+            version = self._version(base_key, create=False)
+            rows = cache.get(f'{base_key}:{version}') if version is not None else None
+            if rows is None:
+                continue
+
+            fresh = self._rows(difficulty, start, player_ids)
+            on_board = {entry['id'] for _, entry in rows}
+            if len(rows) >= self.size and not any(
+                entry['id'] in on_board or sort_key < rows[-1][0] for sort_key, entry in fresh
+            ):
+                continue
+
+            merged = {entry['id']: (sort_key, entry) for sort_key, entry in rows}
+            merged.update((entry['id'], (sort_key, entry)) for sort_key, entry in fresh)
+            patched = [
+                (sort_key, dict(entry, rank=rank))
+                for rank, (sort_key, entry) in enumerate(sorted(merged.values(), key=lambda row: row[0])[:self.size],
+                                                         start=1)
+            ]
+            try:
+                new_version = cache.incr(f'{base_key}:version')
+            except ValueError:
+                continue
+            if new_version == version + 1:
+                cache.set(f'{base_key}:{new_version}', patched, self.timeout)
+            # در غیر این صورت کار دیگری هم‌زمان این جدول را تغییر داده و خواندن بعدی آن را از نو می‌سازد
+
+    def invalidate(self):
+        try:
+            cache.incr(SNAPSHOT_GENERATION_CACHE_KEY)
+        except ValueError:
+            cache.set(SNAPSHOT_GENERATION_CACHE_KEY, 1, None)
+
+
+leaderboard = Leaderboard()
+leaderboard_snapshots = LeaderboardSnapshots(leaderboard)
@@ -0,0 +1,55 @@
+from functools import lru_cache
+
+
+# هر حرف یک بیت در Game.guessed_letters دارد؛ حداکثر ۶۳ حرف در BigIntegerField جا می‌شود
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz' + 'اآبپتثجچحخدذرزژسشصضطظعغفقکگلمنوهیئء'
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(ALPHABET)}
+
+# شکل عربی حروف به شکل فارسی آن‌ها تبدیل می‌شود
+NORMALIZE = str.maketrans({'ي': 'ی', 'ى': 'ی', 'ك': 'ک'})
+
+# حروف کم‌کاربرد که حدس زدنشان سخت‌تر است
+RARE_LETTERS = frozenset('jkqvwxz' + 'ثحذژصضطظغ')
+
+
+def normalize_letter(letter):
+    return letter.lower().translate(NORMALIZE)
+
+
+def normalize_word(text):
+    return text.strip().lower().translate(NORMALIZE)
+
+
+def classify_difficulty(word):
+    """Word difficulty from the number of distinct letters in ``word``, rare letters counting triple."""
+    letters = set(word)
+    points = len(letters) + 2 * len(letters & RARE_LETTERS)
+    if points <= 5:
+        return 'easy'
+    if points <= 8:
+        return 'medium'
+    return 'hard'
+
+
+def letter_bit(letter):
+    """Bit of ``letter`` in a guessed-letters mask, or 0 if it has none."""
+    return LETTER_BITS.get(letter, 0)
+
+
+@lru_cache(maxsize=4096)
+def letter_positions(word):
+    positions = {}
+    for i, c in enumerate(word):
+        positions.setdefault(c, []).append(i)
+    return {c: tuple(indexes) for c, indexes in positions.items()}
+
+
+def reveal(word, masked_word, letter):
+    """Return ``(masked_word, correct)`` after uncovering ``letter`` in ``word``."""
+    positions = letter_positions(word).get(letter)
+    if not positions:
+        return masked_word, False
+    masked = list(masked_word)
+    for i in positions:
+        masked[i] = letter
+    return ''.join(masked), True
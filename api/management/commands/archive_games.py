@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from api.models import ArchivedGame, Game, GameFinishTask, Guess
+
+
+class Command(BaseCommand):
+    help = 'Move finished games older than a threshold, with their guesses, into ArchivedGame'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int,
+                            default=getattr(settings, 'GAME_ARCHIVE_AFTER_DAYS', 30))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        # بازی‌های قدیمی‌تر از فیلد finished_at زمان پایان ندارند
+        archivable = Game.objects.filter(
+            Q(finished_at__lt=cutoff) | Q(finished_at__isnull=True, created_at__lt=cutoff),
+            status='finished',
+        ).exclude(
+            # کار پایان بازی هنوز انجام نشده و به ردیف Game نیاز دارد
+            Exists(GameFinishTask.objects.filter(game=OuterRef('pk'), done_at__isnull=True)),
+        ).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(f'{archivable.count()} games would be archived')
+            return
+
+        archived = 0
+        while True:
+            with transaction.atomic():
+                games = list(archivable.select_for_update()[:options['batch_size']])
+                if not games:
+                    break
+                game_ids = [game.id for game in games]
+                guesses = {}
+                for game_id, player_id, letter in Guess.objects.filter(game_id__in=game_ids).order_by('id') \
+                        .values_list('game_id', 'player_id', 'letter'):
+                    guesses.setdefault(game_id, []).append((player_id, letter))
+
+                ArchivedGame.objects.bulk_create(
+                    [ArchivedGame.from_game(game, guesses.get(game.id, [])) for game in games]
+                )
+                Game.objects.filter(id__in=game_ids).delete()
+            archived += len(games)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{archived} games archived')
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} games finished before {cutoff:%Y-%m-%d %H:%M}'))
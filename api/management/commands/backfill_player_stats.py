@@ -0,0 +1,41 @@
+from collections import defaultdict
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import ArchivedGame, Game, PlayerStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute PlayerStats counters from finished and archived games'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counters = defaultdict(lambda: {'games_played': 0, 'wins': 0, 'losses': 0, 'draws': 0})
+
+        fields = ('player1_id', 'player2_id', 'player1_score', 'player2_score')
+        finished_games = chain(
+            Game.objects.filter(status='finished').values_list(*fields).iterator(chunk_size=batch_size),
+            ArchivedGame.objects.values_list(*fields).iterator(chunk_size=batch_size),
+        )
+        for row in finished_games:
+            for player_id, result in PlayerStats.outcomes(*row):
+                counters[player_id]['games_played'] += 1
+                counters[player_id][result] += 1
+
+        rows = [PlayerStats(player_id=player_id, **values) for player_id, values in counters.items()]
+        with transaction.atomic():
+            PlayerStats.objects.exclude(player_id__in=counters.keys()).delete()
+            PlayerStats.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['player'],
+                update_fields=['games_played', 'wins', 'losses', 'draws'],
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled stats for {len(rows)} players'))
@@ -0,0 +1,54 @@
+from bisect import bisect_left, bisect_right
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Word
+from api.word_pool import word_pool
+from api.word_stats import letter_frequencies, raw_difficulty
+
+
+class Command(BaseCommand):
+    help = (
+        'Compute letter frequencies over all words and store every word\'s difficulty score '
+        '(0-100 percentile)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--relabel', action='store_true',
+                            help='also set Word.difficulty from the score: lowest third easy, highest third hard')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        texts = Word.objects.order_by().values_list('text', flat=True)
+
+        frequencies, total = letter_frequencies(text.lower() for text in texts.iterator(chunk_size=batch_size))
+        if not total:
+            self.stdout.write('No words to score')
+            return
+
+        # امتیاز خام همه‌ی کلمه‌ها برای محاسبه‌ی صدک لازم است؛ فقط اعداد در حافظه نگه داشته می‌شوند
+        raw_scores = sorted(
+            raw_difficulty(text.lower(), frequencies) for text in texts.iterator(chunk_size=batch_size)
+        )
+
+        with transaction.atomic():
+            fields = ['score'] + (['difficulty'] if options['relabel'] else [])
+            batch = []
+            for word in Word.objects.order_by('id').only('id', 'text', 'difficulty').iterator(chunk_size=batch_size):
+                raw = raw_difficulty(word.text.lower(), frequencies)
+                # صدک میانی کلمه‌های هم‌امتیاز، تا امتیاز به ترتیب ردیف‌ها بستگی نداشته باشد
+                rank = (bisect_left(raw_scores, raw) + bisect_right(raw_scores, raw) - 1) / 2
+                word.score = round(100 * rank / max(total - 1, 1))
+                if options['relabel']:
+                    word.difficulty = 'easy' if word.score < 34 else 'medium' if word.score < 67 else 'hard'
+                batch.append(word)
+                if len(batch) >= batch_size:
+                    Word.objects.bulk_update(batch, fields)
+                    batch = []
+            if batch:
+                Word.objects.bulk_update(batch, fields)
+
+        word_pool.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Scored {total} words over {len(frequencies)} letters'))
@@ -0,0 +1,45 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.models import Word
+
+
+class Command(BaseCommand):
+    help = 'Export words as CSV (text,difficulty) or one word per line, streaming from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="file to write, or '-' for standard output")
+        parser.add_argument('--format', choices=['csv', 'lines'],
+                            help='defaults to csv for .csv files and standard output, lines otherwise')
+        parser.add_argument('--difficulty', choices=[value for value, _ in Word.DIFFICULTY_CHOICES])
+        parser.add_argument('--encoding', default='utf-8')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path == '-' or path.endswith('.csv') else 'lines')
+
+        words = Word.objects.order_by('id').values_list('text', 'difficulty')
+        if options['difficulty']:
+            words = words.filter(difficulty=options['difficulty'])
+
+        stream = sys.stdout if path == '-' else open(path, 'w', encoding=options['encoding'], newline='')
+        count = 0
+        try:
+            writer = csv.writer(stream)
+            if file_format == 'csv':
+                writer.writerow(['text', 'difficulty'])
+            for text, difficulty in words.iterator(chunk_size=options['batch_size']):
+                if file_format == 'csv':
+                    writer.writerow([text, difficulty])
+                else:
+                    stream.write(f'{text}\n')
+                count += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f'Exported {count} words to {path}'))
@@ -0,0 +1,98 @@
+import csv
+import io
+import sys
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.letters import classify_difficulty, normalize_word
+from api.models import Word
+from api.word_pool import word_pool
+
+
+DIFFICULTIES = dict(Word.DIFFICULTY_CHOICES)
+MAX_LENGTH = Word._meta.get_field('text').max_length
+
+
+class Command(BaseCommand):
+    help = (
+        'Import words from a CSV (text[,difficulty]) or newline-separated file, in chunks. '
+        'Words already in the database or repeated in the file are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="file to read, or '-' for standard input")
+        parser.add_argument('--format', choices=['csv', 'lines'],
+                            help='defaults to csv for .csv files and lines otherwise')
+        parser.add_argument('--difficulty', choices=list(DIFFICULTIES),
+                            help='difficulty of every word; by default taken from the file or classified')
+        parser.add_argument('--encoding', default='utf-8')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='count what would be imported without writing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'lines')
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding=options['encoding'], newline='')
+        else:
+            if not Path(path).is_file():
+                raise CommandError(f'No such file: {path}')
+            stream = open(path, encoding=options['encoding'], newline='')
+
+        self.counts = {'read': 0, 'created': 0, 'duplicate': 0, 'invalid': 0}
+        try:
+            rows = self.read_rows(stream, file_format)
+            while True:
+                chunk = list(islice(rows, options['batch_size']))
+                if not chunk:
+                    break
+                self.import_chunk(chunk, options['difficulty'], options['dry_run'])
+                if options['verbosity'] >= 2 or self.counts['read'] % 100000 < len(chunk):
+                    self.stdout.write(self.progress())
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.counts['created'] and not options['dry_run']:
+            word_pool.invalidate()
+        self.stdout.write(self.style.SUCCESS(self.progress()))
+
+    def read_rows(self, stream, file_format):
+        """Yield ``(text, difficulty or None)`` without holding more than one line in memory."""
+        if file_format == 'lines':
+            for line in stream:
+                yield line, None
+            return
+        for i, row in enumerate(csv.reader(stream)):
+            if not row or (i == 0 and row[0].strip().lower() == 'text'):
+                continue
+            yield row[0], (row[1].strip().lower() or None) if len(row) > 1 else None
+
+    def import_chunk(self, chunk, difficulty, dry_run):
+        self.counts['read'] += len(chunk)
+        words = {}
+        for text, row_difficulty in chunk:
+            text = normalize_word(text)
+            # کلمه‌ای که حرف غیرالفبایی دارد هیچ‌وقت کامل حدس زده نمی‌شود
+            if not text or len(text) > MAX_LENGTH or not text.isalpha() or \
+                    (row_difficulty is not None and row_difficulty not in DIFFICULTIES):
+                self.counts['invalid'] += 1
+                continue
+            if text in words:
+                self.counts['duplicate'] += 1
+                continue
+            words[text] = difficulty or row_difficulty or classify_difficulty(text)
+
+        existing = set(Word.objects.filter(text__in=list(words)).values_list('text', flat=True))
+        self.counts['duplicate'] += len(existing)
+        new_words = [Word(text=text, difficulty=level) for text, level in words.items() if text not in existing]
+        if new_words and not dry_run:
+            with transaction.atomic():
+                Word.objects.bulk_create(new_words, batch_size=len(new_words))
+        self.counts['created'] += len(new_words)
+
+    def progress(self):
+        return ', '.join(f'{count} {name}' for name, count in self.counts.items())
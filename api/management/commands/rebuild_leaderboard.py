@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import leaderboard, leaderboard_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the leaderboard rank index from Player.score and Player.xp'
+
+    def handle(self, *args, **options):
+        leaderboard.invalidate()
+        leaderboard.reload()
+        leaderboard_snapshots.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Leaderboard rebuilt with {len(leaderboard.index)} players'))
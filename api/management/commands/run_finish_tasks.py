@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.guessing import run_finish_task
+from api.models import GameFinishTask
+
+
+class Command(BaseCommand):
+    help = 'Do the end-of-game work that no background worker completed (run it from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age-seconds', type=int, default=60,
+                            help='leave newer tasks to the worker that queued them')
+        parser.add_argument('--limit', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options['min_age_seconds'])
+        game_ids = list(
+            GameFinishTask.objects.filter(done_at__isnull=True, created_at__lte=cutoff)
+            .order_by('created_at').values_list('game_id', flat=True)[:options['limit']]
+        )
+
+        done = failed = 0
+        for game_id in game_ids:
+            try:
+                done += run_finish_task(game_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Game #{game_id}: {e!r}')
+
+        style = self.style.ERROR if failed else self.style.SUCCESS
+        self.stdout.write(style(f'Finished {done} of {len(game_ids)} pending games ({failed} failed)'))
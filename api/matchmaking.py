@@ -0,0 +1,86 @@
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Game, MatchTicket
+from api.realtime import game_state, get_broker, player_channel, publish_game
+from api.word_pool import word_pool
+
+
+MATCH_ATTEMPTS = 3
+
+
+class MatchmakingError(Exception):
+    pass
+
+
+def level_band(player):
+    band_size = getattr(settings, 'MATCHMAKING_LEVEL_BAND_SIZE', 0)
+    if not band_size:
+        return 0
+    return (player.level - 1) // band_size
+
+
+def notify_match(game):
+    state = game_state(game)
+    message = {'type': 'match.found', 'game': state}
+    for player_id in (game.player1_id, game.player2_id):
+        transaction.on_commit(lambda player_id=player_id: get_broker().publish(player_channel(player_id), message))
+
+
+def find_match(player, difficulty):
+    """
+    Pair ``player`` with the oldest waiting ticket of the same difficulty and
+    level band, or queue a ticket for them.
+
+    Returns ``(game, ticket)``; ``game`` is None while the player waits. The
+    queue head is read through a partial index and claimed with a conditional
+    UPDATE, so two players racing for the same ticket never both get it.
+    """
+    band = level_band(player)
+    with transaction.atomic():
+        MatchTicket.objects.filter(player=player).delete()
+
+        for _ in range(MATCH_ATTEMPTS):
+            opponent_ticket = (
+                MatchTicket.objects.select_for_update(skip_locked=True)
+                .filter(difficulty=difficulty, level_band=band, game__isnull=True)
+                .exclude(player=player)
+                .order_by('created_at')
+                .first()
+            )
+            if opponent_ticket is None:
+                break
+
+            word = word_pool.choose(difficulty)
+            if not word:
+                raise MatchmakingError('No words found for this difficulty')
+
+            game = Game.objects.create(
+                player1_id=opponent_ticket.player_id,
+                player2=player,
+                word=word,
+                masked_word='_' * len(word),
+                difficulty=difficulty,
+                status='active',
+                started_at=timezone.now(),
+                turn_id=random.choice([opponent_ticket.player_id, player.id]),
+            )
+            claimed = MatchTicket.objects.filter(pk=opponent_ticket.pk, game__isnull=True).update(game=game)
+            if not claimed:
+                game.delete()
+                continue
+
+            ticket = MatchTicket.objects.create(player=player, difficulty=difficulty, level_band=band, game=game)
+            publish_game(game)
+            notify_match(game)
+            return game, ticket
+
+        ticket = MatchTicket.objects.create(player=player, difficulty=difficulty, level_band=band)
+        return None, ticket
+
+
+def cancel_match(player):
+    return MatchTicket.objects.filter(player=player, game__isnull=True).delete()[0] > 0
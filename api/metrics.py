@@ -0,0 +1,89 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ViewMetrics:
+    __slots__ = ('requests', 'duration', 'db_queries', 'db_time', 'serialize_time', 'response_bytes',
+                 'over_budget', 'buckets')
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.response_bytes = 0
+        self.over_budget = 0
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+
+
+class MetricsRegistry:
+    """Per-view request metrics of this process, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, duration, db_queries, db_time, serialize_time, response_bytes, over_budget):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            metrics.requests += 1
+            metrics.duration += duration
+            metrics.db_queries += db_queries
+            metrics.db_time += db_time
+            metrics.serialize_time += serialize_time
+            metrics.response_bytes += response_bytes
+            metrics.over_budget += over_budget
+            metrics.buckets[bisect_left(DURATION_BUCKETS, duration)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = []
+            counters = [
+                ('guessword_requests_total', 'counter', 'Requests served', 'requests'),
+                ('guessword_db_queries_total', 'counter', 'Database queries run', 'db_queries'),
+                ('guessword_db_seconds_total', 'counter', 'Time spent in database queries', 'db_time'),
+                ('guessword_serialize_seconds_total', 'counter', 'Time spent rendering response bodies',
+                 'serialize_time'),
+                ('guessword_response_bytes_total', 'counter', 'Response body bytes', 'response_bytes'),
+                ('guessword_query_budget_exceeded_total', 'counter', 'Requests over their query budget',
+                 'over_budget'),
+            ]
+            for name, kind, help_text, attribute in counters:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for view, metrics in views:
+                    lines.append(f'{name}{{view="{view}"}} {getattr(metrics, attribute)}')
+
+            name = 'guessword_request_duration_seconds'
+            lines += [f'# HELP {name} Request wall time', f'# TYPE {name} histogram']
+            for view, metrics in views:
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ('+Inf',), metrics.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{view="{view}"}} {metrics.duration}')
+                lines.append(f'{name}_count{{view="{view}"}} {metrics.requests}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def metrics_view(request):
+    allowed = getattr(settings, 'PERFORMANCE_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,122 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from api.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    __slots__ = ('db_queries', 'db_time', 'serialize_time')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+
+# زمان‌بندی درخواست جاری؛ sync_to_async آن را به رشته‌ی اجرای کوئری‌ها هم می‌برد
+current_timings = ContextVar('current_timings', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # هر اتصال (در هر رشته) یک بار؛ کوئری‌ها به درخواستی که در context است نسبت داده می‌شوند
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def query_budget(view):
+    budget = getattr(settings, 'PERFORMANCE_QUERY_BUDGET', None)
+    if isinstance(budget, dict):
+        return budget.get(view, budget.get('default'))
+    return budget
+
+
+class PerformanceMiddleware:
+    """
+    Records wall time, database queries and time, response rendering time and
+    body size of every request, per view, into ``api.metrics.registry`` and
+    reports them to the client in a ``Server-Timing`` header.
+
+    Requests running more queries than PERFORMANCE_QUERY_BUDGET allows for
+    their view are logged and marked with ``X-Query-Budget-Exceeded``.
+
+    Works on both the sync and async request paths. Queries are attributed
+    through a context variable, so those an async view runs in sync_to_async
+    threads are counted too; work on threads started outside the request
+    (background tasks, the game engine flusher) is not.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, started, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings, started, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def start(self, request):
+        timings = request.performance_timings = RequestTimings()
+        return timings, time.perf_counter(), current_timings.set(timings)
+
+    def finish(self, request, response, timings, started):
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match.route) if match else 'unresolved'
+        size = 0 if response.streaming else len(response.content)
+
+        budget = query_budget(view)
+        over_budget = budget is not None and timings.db_queries > budget
+        if over_budget:
+            logger.warning('%s ran %d queries (budget %d)', view, timings.db_queries, budget)
+            response['X-Query-Budget-Exceeded'] = f'{timings.db_queries}/{budget}'
+
+        registry.observe(view, duration, timings.db_queries, timings.db_time, timings.serialize_time, size,
+                         over_budget)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_time * 1000:.2f};desc="{timings.db_queries} queries"',
+            f'serialize;dur={timings.serialize_time * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ])
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+# نسخه‌ی ثابت api.letters.ALPHABET در زمان این مهاجرت؛ تغییرهای بعدی الفبا نباید آن را عوض کنند
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz' + 'اآبپتثجچحخدذرزژسشصضطظعغفقکگلمنوهیئء'
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(ALPHABET)}
+
+
+def fill_guessed_letters(apps, schema_editor):
+    Game = apps.get_model('api', 'Game')
+    Guess = apps.get_model('api', 'Guess')
+    games = Game.objects.exclude(status='finished').values_list('id', flat=True)
+    for game_id in games.iterator():
+        guessed_letters, other_letters = 0, ''
+        for letter in Guess.objects.filter(game_id=game_id).order_by('id').values_list('letter', flat=True):
+            if letter in LETTER_BITS:
+                guessed_letters |= LETTER_BITS[letter]
+            else:
+                other_letters += letter
+        Game.objects.filter(id=game_id).update(guessed_letters=guessed_letters, other_letters=other_letters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_game_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='guessed_letters',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='other_letters',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(fill_guessed_letters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:44
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_guesses(apps, schema_editor):
+    # قبل از ساختن قید یکتایی، فقط اولین حدس هر حرف در هر بازی نگه داشته می‌شود
+    Guess = apps.get_model('api', 'Guess')
+    duplicates = (
+        Guess.objects.values('game_id', 'letter')
+        .annotate(first_id=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates.iterator():
+        Guess.objects.filter(game_id=row['game_id'], letter=row['letter']).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_game_guessed_letters'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('player2__isnull', True), ('status', 'waiting')), fields=['created_at'], name='game_waiting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player1', 'status'], name='game_player1_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player2', 'status'], name='game_player2_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player1', '-started_at'], name='game_player1_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player2', '-started_at'], name='game_player2_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['-score', '-xp'], name='player_leaderboard_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_guesses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='guess',
+            constraint=models.UniqueConstraint(fields=('game', 'letter'), name='unique_guess_letter_per_game'),
+        ),
+    ]
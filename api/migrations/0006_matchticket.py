@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_game_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('level_band', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.game')),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='match_ticket', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('game__isnull', True)), fields=['difficulty', 'level_band', 'created_at'], name='match_ticket_queue_idx')],
+            },
+        ),
+    ]
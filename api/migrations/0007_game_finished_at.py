@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_matchticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('status', 'finished')), fields=['finished_at'], name='game_finished_idx'),
+        ),
+    ]
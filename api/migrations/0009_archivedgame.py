@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_word_text_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedGame',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('player1_score', models.PositiveSmallIntegerField(default=0)),
+                ('player2_score', models.PositiveSmallIntegerField(default=0)),
+                ('word', models.CharField(max_length=64)),
+                ('masked_word', models.CharField(max_length=64)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('guesses', models.TextField(blank=True, default='')),
+                ('guess_players', models.TextField(blank=True, default='')),
+                ('player1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_games_created', to=settings.AUTH_USER_MODEL)),
+                ('player2', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_games_joined', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player1', '-started_at'], name='archived_player1_started_idx'), models.Index(fields=['player2', '-started_at'], name='archived_player2_started_idx'), models.Index(fields=['finished_at'], name='archived_finished_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_archivedgame'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(fields=['difficulty', 'score'], name='word_difficulty_score_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_game_finish_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedgame',
+            index=models.Index(fields=['difficulty', 'finished_at'], name='archived_difficulty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['difficulty', 'status', 'finished_at'], name='game_difficulty_idx'),
+        ),
+    ]
@@ -11,6 +11,9 @@ class Player(AbstractUser):
     class Meta:
         verbose_name = 'Player'
         verbose_name_plural = 'Players'
+        indexes = [
+            models.Index(fields=['-score', '-xp'], name='player_leaderboard_idx'),
+        ]
 
 
 
@@ -26,6 +29,14 @@ class Word(models.Model):
 
     text = models.CharField(max_length=64)
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    # امتیاز سختی که compute_word_stats می‌سازد (api/word_stats.py)
+    score = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['text'], name='word_text_idx'),
+            models.Index(fields=['difficulty', 'score'], name='word_difficulty_score_idx'),
+        ]
 
     def __str__(self):
         return f'{self.text} ({self.difficulty})'
@@ -39,6 +50,11 @@ class Game(models.Model):
         ('paused', 'Paused'),
         ('finished', 'Finished'),
     ]
+    AI_LEVEL_CHOICES = [
+        ('easy', 'Easy'),
+        ('medium', 'Medium'),
+        ('hard', 'Hard'),
+    ]
 
     player1 = models.ForeignKey('Player', related_name='games_created', on_delete=models.CASCADE)
     player2 = models.ForeignKey('Player', related_name='games_joined', on_delete=models.CASCADE, null=True, blank=True)
@@ -50,16 +66,216 @@ class Game(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='waiting')
     created_at = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
     turn = models.ForeignKey('Player', related_name='turns', on_delete=models.SET_NULL, null=True, blank=True)
+    # بازی تک‌نفره: حریف هوش مصنوعی است و player2 خالی می‌ماند (api/ai.py)
+    ai_level = models.CharField(max_length=10, choices=AI_LEVEL_CHOICES, blank=True, default='')
+    # بیت‌های حروف حدس زده شده، بر اساس api.letters.ALPHABET
+    guessed_letters = models.BigIntegerField(default=0)
+    # حروف حدس زده شده‌ای که در ALPHABET نیستند و بیت ندارند
+    other_letters = models.TextField(blank=True, default='')
+    # هر تغییر در وضعیت بازی این شمارنده را یکی بالا می‌برد (برای ETag و long-poll)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['created_at'], name='game_waiting_idx',
+                condition=models.Q(status='waiting', player2__isnull=True),
+            ),
+            models.Index(fields=['player1', 'status'], name='game_player1_status_idx'),
+            models.Index(fields=['player2', 'status'], name='game_player2_status_idx'),
+            models.Index(fields=['player1', '-started_at'], name='game_player1_started_idx'),
+            models.Index(fields=['player2', '-started_at'], name='game_player2_started_idx'),
+            models.Index(
+                fields=['finished_at'], name='game_finished_idx',
+                condition=models.Q(status='finished'),
+            ),
+            # جدول‌های امتیاز هر سطح سختی (api.leaderboard.scoped_totals)
+            models.Index(fields=['difficulty', 'status', 'finished_at'], name='game_difficulty_idx'),
+        ]
 
     def __str__(self):
         return f'Game #{self.pk} - {self.status}'
 
+    @property
+    def etag(self):
+        return f'"{self.pk}-{self.version}"'
+
+    def change_status(self, expected, status):
+        """
+        Move the game from ``expected`` to ``status`` if its row still has the
+        version this instance was read with; returns whether it did. On
+        success the instance is reloaded.
+        """
+        updated = Game.objects.filter(pk=self.pk, status=expected, version=self.version).update(
+            status=status, version=models.F('version') + 1,
+        )
+        if updated:
+            self.refresh_from_db()
+        return bool(updated)
+
 
 
 class Guess(models.Model):
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='guesses')
-    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    # خالی برای حدس‌های هوش مصنوعی
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, null=True, blank=True)
     letter = models.CharField(max_length=1)
     correct = models.BooleanField()
-    guessed_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    guessed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'letter'], name='unique_guess_letter_per_game'),
+        ]
+
+
+class PlayerStats(models.Model):
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    games_played = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Player stats'
+        verbose_name_plural = 'Player stats'
+
+    def __str__(self):
+        return f'Stats for player #{self.player_id}'
+
+    @property
+    def win_rate(self):
+        if not self.games_played:
+            return 0.0
+        return round((self.wins / self.games_played) * 100, 2)
+
+    @classmethod
+    def for_player(cls, player):
+        try:
+            return player.stats
+        except cls.DoesNotExist:
+            return cls(player=player)
+
+    @staticmethod
+    def outcomes(player1_id, player2_id, player1_score, player2_score):
+        # بازی بدون حریف مثل بازی با امتیاز صفر برای حریف حساب می‌شود
+        if player1_score > player2_score:
+            results = [(player1_id, 'wins'), (player2_id, 'losses')]
+        elif player2_score > player1_score:
+            results = [(player1_id, 'losses'), (player2_id, 'wins')]
+        else:
+            results = [(player1_id, 'draws'), (player2_id, 'draws')]
+        return [(player_id, result) for player_id, result in results if player_id is not None]
+
+    @classmethod
+    def record_game(cls, game):
+        for player_id, result in cls.outcomes(game.player1_id, game.player2_id,
+                                              game.player1_score, game.player2_score):
+            cls.objects.get_or_create(player_id=player_id)
+            cls.objects.filter(player_id=player_id).update(
+                games_played=models.F('games_played') + 1,
+                **{result: models.F(result) + 1}
+            )
+
+
+
+class GameFinishTask(models.Model):
+    """
+    End-of-game work of a finished game (scores, stats, leaderboard),
+    recorded in the transaction that finished it and done exactly once by
+    api.guessing.run_finish_task; the game id is the idempotency key.
+    """
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, primary_key=True, related_name='finish_task')
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    done_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='finish_task_pending_idx', condition=models.Q(done_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f'Finish task of game #{self.game_id}'
+
+
+class MatchTicket(models.Model):
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name='match_ticket')
+    difficulty = models.CharField(max_length=10, choices=Word.DIFFICULTY_CHOICES)
+    level_band = models.PositiveSmallIntegerField(default=0)
+    # خالی یعنی بازیکن در صف است؛ بلیت بازی جفت‌شده با پایان یا حذف بازی پاک می‌شود
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['difficulty', 'level_band', 'created_at'], name='match_ticket_queue_idx',
+                condition=models.Q(game__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'Match ticket of player #{self.player_id} ({self.difficulty})'
+
+
+class ArchivedGame(models.Model):
+    """
+    A finished game moved out of Game (and its Guess rows) by the
+    archive_games command. The Game id is kept, so history cursors work
+    across both tables. Guesses are packed into two strings: the letters in
+    the order they were guessed and, for each letter, '1' or '2' for the
+    player who guessed it.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    player1 = models.ForeignKey(Player, related_name='archived_games_created', on_delete=models.CASCADE)
+    player2 = models.ForeignKey(Player, related_name='archived_games_joined', on_delete=models.CASCADE,
+                                null=True, blank=True)
+    ai_level = models.CharField(max_length=10, choices=Game.AI_LEVEL_CHOICES, blank=True, default='')
+    player1_score = models.PositiveSmallIntegerField(default=0)
+    player2_score = models.PositiveSmallIntegerField(default=0)
+    word = models.CharField(max_length=64)
+    masked_word = models.CharField(max_length=64)
+    difficulty = models.CharField(max_length=10, choices=Word.DIFFICULTY_CHOICES)
+    created_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    guesses = models.TextField(blank=True, default='')
+    guess_players = models.TextField(blank=True, default='')
+
+    status = 'finished'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['player1', '-started_at'], name='archived_player1_started_idx'),
+            models.Index(fields=['player2', '-started_at'], name='archived_player2_started_idx'),
+            models.Index(fields=['finished_at'], name='archived_finished_idx'),
+            models.Index(fields=['difficulty', 'finished_at'], name='archived_difficulty_idx'),
+        ]
+
+    def __str__(self):
+        return f'Archived game #{self.pk}'
+
+    @classmethod
+    def from_game(cls, game, guesses):
+        """``guesses`` are the game's ``(player_id, letter)`` in guess order."""
+        return cls(
+            id=game.id,
+            player1_id=game.player1_id,
+            player2_id=game.player2_id,
+            ai_level=game.ai_level,
+            player1_score=game.player1_score,
+            player2_score=game.player2_score,
+            word=game.word,
+            masked_word=game.masked_word,
+            difficulty=game.difficulty,
+            created_at=game.created_at,
+            started_at=game.started_at,
+            finished_at=game.finished_at,
+            guesses=''.join(letter for _, letter in guesses),
+            guess_players=''.join('1' if player_id == game.player1_id else '2' for player_id, _ in guesses),
+        )
+
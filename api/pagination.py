@@ -0,0 +1,118 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on ``(ordering_field, id)``.
+
+    Unlike offset pagination every page is a single index range scan that
+    starts right after the last row of the previous page, so the cost of a
+    page does not grow with how far the client has scrolled. ``None`` values
+    of the ordering field sort last.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, ordering_field, descending=False):
+        self.ordering_field = ordering_field
+        self.descending = descending
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'GAME_LIST_PAGE_SIZE', 20)
+        value = request.query_params.get(self.page_size_query_param, '')
+        if value.isdigit() and int(value) > 0:
+            page_size = int(value)
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def position(obj, field):
+        """``(value of field, pk)`` of a model instance or a ``.values()`` row."""
+        if isinstance(obj, dict):
+            return obj[field], obj['id']
+        return getattr(obj, field), obj.pk
+
+    def encode_cursor(self, obj):
+        value, pk = self.position(obj, self.ordering_field)
+        position = [value.isoformat() if value is not None else None, pk]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return (parse_datetime(value) if value is not None else None), int(pk)
+        except (ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+
+    def after(self, value, pk):
+        field = self.ordering_field
+        op = 'lt' if self.descending else 'gt'
+        if value is None:
+            return Q(**{f'{field}__isnull': True, f'pk__{op}': pk})
+        return (
+            Q(**{f'{field}__{op}': value}) |
+            Q(**{field: value, f'pk__{op}': pk}) |
+            Q(**{f'{field}__isnull': True})
+        )
+
+    def get_page_queryset(self, queryset, request):
+        """The queryset of the requested page plus one row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        order = F(self.ordering_field)
+        order = order.desc(nulls_last=True) if self.descending else order.asc(nulls_last=True)
+        queryset = queryset.order_by(order, '-pk' if self.descending else 'pk')
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(*self.decode_cursor(cursor)))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def paginate_querysets(self, querysets, request):
+        """
+        One page over several querysets of rows with distinct pks, such as
+        live and archived games: each is read up to the page size from the
+        cursor and the results are merged.
+        """
+        rows = []
+        for queryset in querysets:
+            rows += self.get_page_queryset(queryset, request)
+        rows.sort(key=self.sort_key, reverse=self.descending)
+        return self.set_page(rows)
+
+    def sort_key(self, obj):
+        value, pk = self.position(obj, self.ordering_field)
+        if self.descending:
+            return value is not None, value, pk
+        return value is None, value, pk
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,290 @@
+import abc
+import asyncio
+import json
+import re
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from api.models import Game, MatchTicket, Player
+
+
+def game_channel(game_id):
+    return f'game:{game_id}'
+
+
+def player_channel(player_id):
+    return f'player:{player_id}'
+
+
+class Broker(abc.ABC):
+    """
+    Fan-out of JSON-serialisable messages to websocket subscribers.
+
+    ``publish`` is called from synchronous view code, ``subscribe`` and
+    ``unsubscribe`` from the event loop serving the websocket.
+    """
+
+    @abc.abstractmethod
+    def publish(self, channel, message):
+        """Deliver ``message`` to every queue subscribed to ``channel``."""
+
+    @abc.abstractmethod
+    async def subscribe(self, channel, queue):
+        """Start putting the messages of ``channel`` on the asyncio ``queue``."""
+
+    @abc.abstractmethod
+    async def unsubscribe(self, channel, queue):
+        """Stop delivering the messages of ``channel`` to ``queue``."""
+
+
+class InMemoryBroker(Broker):
+    """Delivers messages to subscribers living in the same process."""
+
+    def __init__(self, **options):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # حلقه‌ی رویداد این مشترک بسته شده است
+                pass
+
+    async def subscribe(self, channel, queue):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add((asyncio.get_running_loop(), queue))
+
+    async def unsubscribe(self, channel, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.discard((asyncio.get_running_loop(), queue))
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+
+class RedisBroker(Broker):
+    """
+    Redis pub/sub broker for deployments with several ASGI nodes.
+
+    Requires the optional ``redis`` package; configure it with
+    GAME_BROKER_OPTIONS = {'url': 'redis://...'}.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='guessword:', **options):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError('RedisBroker requires the "redis" package') from exc
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+        self._readers = {}
+
+    def publish(self, channel, message):
+        self._client.publish(self.prefix + channel, json.dumps(message))
+
+    async def subscribe(self, channel, queue):
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(self.prefix + channel)
+
+        async def reader():
+            async for item in pubsub.listen():
+                if item['type'] == 'message':
+                    queue.put_nowait(json.loads(item['data']))
+
+        self._readers[id(queue)] = (pubsub, asyncio.create_task(reader()))
+
+    async def unsubscribe(self, channel, queue):
+        pubsub, task = self._readers.pop(id(queue), (None, None))
+        if task is not None:
+            task.cancel()
+            await pubsub.unsubscribe(self.prefix + channel)
+            await pubsub.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = import_string(getattr(settings, 'GAME_BROKER', 'api.realtime.InMemoryBroker'))
+                _broker = broker_class(**getattr(settings, 'GAME_BROKER_OPTIONS', {}))
+    return _broker
+
+
+def game_state(game, usernames=None):
+    if usernames is None:
+        player_ids = {game.player1_id, game.player2_id, game.turn_id} - {None}
+        usernames = dict(Player.objects.filter(id__in=player_ids).values_list('id', 'username'))
+    return {
+        'game_id': game.id,
+        'status': game.status,
+        'player1': usernames.get(game.player1_id),
+        'player2': usernames.get(game.player2_id),
+        'turn': usernames.get(game.turn_id),
+        'masked_word': game.masked_word,
+        'player1_score': game.player1_score,
+        'player2_score': game.player2_score,
+    }
+
+
+def publish_game(game, usernames=None):
+    state = game_state(game, usernames)
+    transaction.on_commit(lambda: get_broker().publish(game_channel(game.id), {'type': 'game.update', 'game': state}))
+
+
+GAME_PATH_RE = re.compile(r'^/ws/games/(?P<game_id>\d+)/$')
+MATCHMAKING_PATH = '/ws/matchmaking/'
+
+
+async def wait_for_game_change(game_id, known_version, timeout):
+    """
+    Wait up to ``timeout`` seconds for game ``game_id`` to move past
+    ``known_version`` and return its current version.
+
+    Waiters are woken by the game's broker channel, so the version is read
+    again only after a message, or every GAME_STATUS_POLL_INTERVAL seconds
+    to catch changes published where this broker cannot hear them (another
+    process with the in-memory broker).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    interval = getattr(settings, 'GAME_STATUS_POLL_INTERVAL', 5)
+    read_version = sync_to_async(current_game_version)
+    channel = game_channel(game_id)
+    queue = asyncio.Queue()
+    broker = get_broker()
+
+    # اشتراک قبل از خواندن نسخه، تا تغییری بین این دو از دست نرود
+    await broker.subscribe(channel, queue)
+    try:
+        version = await read_version(game_id)
+        while version == known_version and (remaining := deadline - loop.time()) > 0:
+            try:
+                await asyncio.wait_for(queue.get(), min(interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+            version = await read_version(game_id)
+    finally:
+        await broker.unsubscribe(channel, queue)
+    return version
+
+
+def current_game_version(game_id):
+    """The version of game ``game_id``, from the game engine when it holds the game."""
+    from api.engine import engine_snapshot
+
+    state = engine_snapshot(game_id)
+    if state is not None:
+        return state.version
+    return Game.objects.filter(id=game_id).values_list('version', flat=True).first()
+
+
+async def authenticate_token(token):
+    """The id of the active player ``token`` was issued to, or None."""
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    from api.authentication import CachedJWTAuthentication
+
+    # همان جست‌وجوی کش‌شده‌ی احراز هویت HTTP، تا بازیکن حذف‌شده یا غیرفعال وصل نشود
+    authentication = CachedJWTAuthentication()
+    try:
+        user = await authentication.aget_user(authentication.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return user.id if user.is_active else None
+
+
+@sync_to_async
+def load_game_for_player(game_id, player_id):
+    from api.engine import engine_snapshot
+
+    state = engine_snapshot(game_id)
+    if state is not None:
+        return game_state(state, state.usernames) if player_id in (state.player1_id, state.player2_id) else None
+    game = Game.objects.filter(Q(player1_id=player_id) | Q(player2_id=player_id), id=game_id).first()
+    if game is None:
+        return None
+    return game_state(game)
+
+
+@sync_to_async
+def load_match_ticket(player_id):
+    ticket = MatchTicket.objects.filter(player_id=player_id).select_related('game').first()
+    if ticket is None:
+        return {'type': 'match.none'}
+    if ticket.game is None:
+        return {'type': 'match.waiting', 'difficulty': ticket.difficulty}
+    return {'type': 'match.found', 'game': game_state(ticket.game)}
+
+
+async def websocket_application(scope, receive, send):
+    """
+    ASGI websocket endpoints, authenticated with ``?token=<access token>``:
+
+    ``/ws/games/<game_id>/`` sends the current game state on connect and
+    every update published for the game afterwards; only the game's players
+    may subscribe. ``/ws/matchmaking/`` sends the player's match ticket state
+    and a ``match.found`` message once matchmaking pairs them.
+    """
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    player_id = await authenticate_token(query.get('token', [''])[0])
+    match = GAME_PATH_RE.match(scope['path'])
+    if player_id is None or (match is None and scope['path'] != MATCHMAKING_PATH):
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+
+    if match is not None:
+        game_id = int(match['game_id'])
+        state = await load_game_for_player(game_id, player_id)
+        if state is None:
+            await send({'type': 'websocket.close', 'code': 4403})
+            return
+        channel = game_channel(game_id)
+        initial = {'type': 'game.state', 'game': state}
+    else:
+        channel = player_channel(player_id)
+        initial = await load_match_ticket(player_id)
+
+    await send({'type': 'websocket.accept'})
+    await send({'type': 'websocket.send', 'text': json.dumps(initial)})
+
+    broker = get_broker()
+    queue = asyncio.Queue()
+    await broker.subscribe(channel, queue)
+    try:
+        receiver = asyncio.ensure_future(receive())
+        while True:
+            message = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({receiver, message}, return_when=asyncio.FIRST_COMPLETED)
+            if message in done:
+                await send({'type': 'websocket.send', 'text': json.dumps(message.result())})
+            else:
+                message.cancel()
+            if receiver in done:
+                if receiver.result()['type'] == 'websocket.disconnect':
+                    break
+                receiver = asyncio.ensure_future(receive())
+    finally:
+        receiver.cancel()
+        await broker.unsubscribe(channel, queue)
@@ -0,0 +1,42 @@
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that adds its rendering time to the request's performance timings."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        try:
+            return self.encode(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get('request')
+            timings = getattr(getattr(request, '_request', request), 'performance_timings', None)
+            if timings is not None:
+                timings.serialize_time += time.perf_counter() - started
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(TimedJSONRenderer):
+    """
+    TimedJSONRenderer that encodes with orjson when it is installed. Output
+    matches JSONRenderer's compact, non-ASCII-escaping form; indented
+    (browsable/?indent) responses and types orjson does not know go through
+    DRF's encoder.
+    """
+
+    def encode(self, data, accepted_media_type, renderer_context):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().encode(data, accepted_media_type, renderer_context)
+        encoder = self.encoder_class()
+        ret = orjson.dumps(data, default=encoder.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        # مثل JSONRenderer، این دو کاراکتر برای جاوااسکریپت escape می‌شوند
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from .models import Game, Player, Word
-from django.db.models import Q
+from .leaderboard import leaderboard
+from .letters import normalize_letter
+from django.conf import settings
+
+
 
 class GameSerializer(serializers.ModelSerializer):
     player1 = serializers.CharField(source='player1.username')
@@ -20,7 +24,7 @@ class GameSerializer(serializers.ModelSerializer):
         return obj.player1_score
 
     def get_player2_score(self, obj):
-        return obj.player2_score if obj.player2 else 0
+        return obj.player2_score if obj.player2_id or obj.ai_level else 0
 
 
 
@@ -30,6 +34,45 @@ class GameSerializer(serializers.ModelSerializer):
 
 class GameCreateSerializer(serializers.Serializer):
     difficulty = serializers.ChoiceField(choices=['easy', 'medium', 'hard'])
+    min_score = serializers.IntegerField(required=False, min_value=0, max_value=100)
+    max_score = serializers.IntegerField(required=False, min_value=0, max_value=100)
+    ai_level = serializers.ChoiceField(choices=Game.AI_LEVEL_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('min_score', 0) > attrs.get('max_score', 100):
+            raise serializers.ValidationError('min_score cannot be greater than max_score')
+        return attrs
+
+
+
+
+class PlayAISerializer(serializers.Serializer):
+    ai_level = serializers.ChoiceField(choices=Game.AI_LEVEL_CHOICES, default='medium')
+
+
+
+
+class GuessMoveSerializer(serializers.Serializer):
+    game_id = serializers.IntegerField()
+    letter = serializers.CharField(trim_whitespace=False)
+
+    def validate_letter(self, value):
+        letter = normalize_letter(value)
+        if len(letter) != 1 or not letter.isalpha():
+            raise serializers.ValidationError('Invalid letter')
+        return letter
+
+
+
+
+class GuessBatchSerializer(serializers.Serializer):
+    moves = GuessMoveSerializer(many=True, allow_empty=False)
+
+    def validate_moves(self, value):
+        max_moves = getattr(settings, 'GUESS_BATCH_MAX_MOVES', 100)
+        if len(value) > max_moves:
+            raise serializers.ValidationError(f'At most {max_moves} moves per request')
+        return value
 
 
 
@@ -62,6 +105,13 @@ class PlayerSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'score', 'level', 'xp']
         read_only_fields = ['score', 'level', 'xp']
 
+    def update(self, instance, validated_data):
+        # فقط فیلدهای ویرایش‌شده ذخیره می‌شوند تا امتیازی که بازی‌ها هم‌زمان می‌دهند بازنویسی نشود
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
 
 
@@ -96,9 +146,7 @@ class ProfileSerializer(serializers.Serializer):
         return getattr(obj, 'win_rate', "0.0%")
 
     def get_rank(self, obj):
-        players = Player.objects.order_by('-score')
-        rank = list(players.values_list('id', flat=True)).index(obj.id) + 1
-        return rank
+        return leaderboard.rank(obj)
 
 
 
@@ -117,8 +165,8 @@ class GameHistorySerializer(serializers.ModelSerializer):
 
     def get_opponent(self, obj):
         user = self.context['request'].user
-        if obj.player1 == user:
-            return obj.player2.username if obj.player2 else "AI"
+        if obj.player1_id == user.id:
+            return obj.player2.username if obj.player2_id else "AI"
         return obj.player1.username
 
     def get_result(self, obj):
@@ -126,71 +174,28 @@ class GameHistorySerializer(serializers.ModelSerializer):
         if obj.status != 'finished':
             return None
 
-        player1 = obj.player1
-        player2 = obj.player2
-
         # امتیازهای همان بازی
         p1_score = obj.player1_score
         p2_score = obj.player2_score
 
         if p1_score > p2_score:
-            return 'win' if user == player1 else 'lose'
+            return 'win' if user.id == obj.player1_id else 'lose'
         elif p2_score > p1_score:
-            return 'win' if user == player2 else 'lose'
+            return 'win' if user.id == obj.player2_id else 'lose'
         return 'draw'
 
     def get_your_score(self, obj):
         user = self.context['request'].user
-        if obj.player1 == user:
+        if obj.player1_id == user.id:
             return obj.player1_score
-        elif obj.player2 == user:
+        elif obj.player2_id == user.id:
             return obj.player2_score
         return 0
 
     def get_opponent_score(self, obj):
         user = self.context['request'].user
-        if obj.player1 == user:
-            return obj.player2_score if obj.player2 else 0
-        elif obj.player2 == user:
+        if obj.player1_id == user.id:
+            return obj.player2_score if obj.player2_id or obj.ai_level else 0
+        elif obj.player2_id == user.id:
             return obj.player1_score
         return 0
-
-
-
-
-class LeaderboardSerializer(serializers.ModelSerializer):
-    win_rate = serializers.SerializerMethodField()
-    rank = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Player
-        fields = ['id', 'username', 'score', 'level', 'xp', 'win_rate', 'rank']
-        read_only_fields = fields
-
-    def get_win_rate(self, obj):
-
-        finished_games = Game.objects.filter(
-            (Q(player1=obj) | Q(player2=obj)) &
-            Q(status='finished')
-        )
-        total_games = finished_games.count()
-
-        wins = 0
-        for game in finished_games:
-            player1 = game.player1
-            player2 = game.player2 if game.player2 else obj
-
-            if game.player1_score > game.player2_score and player1 == obj:
-                wins += 1
-            elif game.player2_score > game.player1_score and player2 == obj:
-                wins += 1
-
-
-        if total_games > 0:
-            return f"{round((wins / total_games) * 100, 2)}%"
-        return "0%"
-
-    def get_rank(self, obj):
-
-        players = list(Player.objects.order_by('-score').values_list('id', flat=True))
-        return players.index(obj.id) + 1
\ No newline at end of file
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import forget_users
+from api.leaderboard import leaderboard
+from api.models import Player, Word
+from api.word_pool import word_pool
+
+
+@receiver(post_save, sender=Word)
+@receiver(post_delete, sender=Word)
+def invalidate_word_pool(sender, **kwargs):
+    # اگر نسل پیش از commit عوض شود، پردازه‌ی دیگری فهرست قدیمی را با نسل تازه در کش می‌گذارد
+    transaction.on_commit(word_pool.invalidate)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def forget_cached_player(sender, instance, **kwargs):
+    # delete() پیش از اجرای on_commit شناسه‌ی نمونه را None می‌کند
+    player_id = instance.pk
+    transaction.on_commit(lambda: forget_users([player_id]))
+
+
+@receiver(post_delete, sender=Player)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    player_id = instance.pk
+    transaction.on_commit(lambda: leaderboard.remove(player_id))
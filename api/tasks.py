@@ -0,0 +1,59 @@
+"""
+A small in-process background task runner.
+
+Tasks are plain callables run on a thread pool of BACKGROUND_TASK_WORKERS
+threads, each with its own database connection. Nothing here is durable:
+callers that must not lose work record it in the database first (see
+GameFinishTask) and only use the runner to do it sooner.
+"""
+
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return getattr(settings, 'BACKGROUND_TASK_WORKERS', 2)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='background-task')
+        return self._executor
+
+    def submit(self, function, *args):
+        return self._get_executor().submit(self._run, function, *args)
+
+    @staticmethod
+    def _run(function, *args):
+        try:
+            return function(*args)
+        except Exception:
+            logger.exception('Background task %s%r failed', getattr(function, '__name__', function), args)
+        finally:
+            close_old_connections()
+
+    def shutdown(self):
+        """Wait for the submitted tasks to finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+background_tasks = BackgroundTasks()
+atexit.register(background_tasks.shutdown)
@@ -0,0 +1,458 @@
+import importlib.util
+import io
+import re
+import threading
+import time
+import types
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django import urls
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import async_views
+from api.guessing import XP_PER_LEVEL, GuessError, award_players, check_guess, submit_guess
+from api.leaderboard import Leaderboard, leaderboard
+from api.models import ArchivedGame, Game, Guess, Player, PlayerStats
+from api.realtime import authenticate_token
+
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class QueryCountTests(TestCase):
+    # تعداد کوئری هر endpoint باید مستقل از تعداد ردیف‌های نتیجه باشد
+    QUERY_BUDGETS = {
+        '/api/waiting-games/': 1,
+        # بازی‌های جاری و بایگانی‌شده، هرکدام یک کوئری برای هر طرف بازی
+        '/api/history/': 4,
+        # جدول‌های امتیاز از کش خوانده می‌شوند
+        '/api/leaderboard/': 0,
+        '/api/leaderboard/?period=weekly&difficulty=easy': 0,
+        '/api/profile/': 1,
+    }
+
+    def create_games(self, size):
+        players = [
+            Player.objects.create_user(username=f'query-count-{size}-{i}')
+            for i in range(size + 1)
+        ]
+        user, opponents = players[0], players[1:]
+        for opponent in opponents:
+            Game.objects.create(player1=opponent, word='word', masked_word='____', difficulty='easy')
+            Game.objects.create(player1=user, player2=opponent, word='word', masked_word='w___',
+                                difficulty='easy', status='active', turn=user)
+            Game.objects.create(player1=opponent, player2=user, word='word', masked_word='word',
+                                difficulty='easy', status='finished', player2_score=20)
+        return user
+
+    def test_list_endpoints_run_a_fixed_number_of_queries(self):
+        client = APIClient()
+        for size in (2, 20):
+            user = self.create_games(size)
+            for path, budget in self.QUERY_BUDGETS.items():
+                with self.subTest(path=path, games=size):
+                    client.force_authenticate(user)
+                    client.get(path)  # بارگذاری کش‌های داخل پردازه
+                    # مثل یک درخواست واقعی، کاربر تازه و بدون کش رابطه‌ها
+                    client.force_authenticate(Player.objects.get(pk=user.pk))
+                    with self.assertNumQueries(budget):
+                        response = client.get(path)
+                    self.assertEqual(response.status_code, 200)
+
+
+class QueryPlanTests(TestCase):
+    PLAYER_ID = 1
+
+    def audited_queries(self):
+        """(name, queryset, pattern of the index the plan must use)"""
+        player_id = self.PLAYER_ID
+        newest_first = (F('started_at').desc(nulls_last=True), '-pk')
+        queries = [
+            ('waiting games', Game.objects.filter(
+                Q(status='waiting', player2__isnull=True) |
+                Q(status='active', player1_id=player_id) |
+                Q(status='active', player2_id=player_id)
+            ), r'game_waiting_idx|game_player[12]_status_idx'),
+            ('finished games per player', Game.objects.filter(
+                Q(player1_id=player_id) | Q(player2_id=player_id), status='finished'
+            ), r'game_player[12]_status_idx'),
+            ('leaderboard', Player.objects.order_by('-score', '-xp')[:10], r'player_leaderboard_idx'),
+            ('guess per game and letter', Guess.objects.filter(game_id=0, letter='a'),
+             r'unique_guess_letter_per_game|sqlite_autoindex_api_guess'),
+        ]
+        # جدول امتیاز یک سطح سختی در یک روز یا هفته
+        since = timezone.now() - timedelta(days=7)
+        for name, games, pattern in (
+            ('scoped totals', Game.objects.filter(status='finished'), r'game_difficulty_idx'),
+            ('archived scoped totals', ArchivedGame.objects.all(), r'archived_difficulty_idx'),
+        ):
+            queries.append((name, games.filter(difficulty='easy', finished_at__gte=since).order_by()
+                            .values('player1').annotate(score=Sum('player1_score')), pattern))
+        # تاریخچه باید از اندیس‌های (player, -started_at) بخواند، نه اندیس کلید خارجی
+        for side in ('player1', 'player2'):
+            queries += [
+                (f'history as {side}', Game.objects.filter(**{side: player_id}).order_by(*newest_first)[:21],
+                 rf'game_{side}_started_idx'),
+                (f'archived history as {side}',
+                 ArchivedGame.objects.filter(**{side: player_id}).order_by(*newest_first)[:21],
+                 rf'archived_{side}_started_idx'),
+            ]
+        return queries
+
+    def test_listing_queries_use_their_indexes(self):
+        if connection.vendor == 'postgresql':
+            # جدول‌های آزمایشی کوچک‌اند و بدون این تنظیم همیشه seq scan انتخاب می‌شود
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset, pattern in self.audited_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertRegex(plan, re.compile(pattern, re.IGNORECASE), f'{name} does not use its index:\n{plan}')
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # api/urls.py دوباره با API_ASYNC_VIEWS اجرا می‌شود تا مسیرها به نماهای async برسند
+        spec = importlib.util.find_spec('api.urls')
+        api_urls = importlib.util.module_from_spec(spec)
+        with override_settings(API_ASYNC_VIEWS=True):
+            spec.loader.exec_module(api_urls)
+        cls.async_urlconf = types.ModuleType('async_urls')
+        cls.async_urlconf.urlpatterns = [urls.path('api/', urls.include(api_urls))]
+
+    def setUp(self):
+        user = Player.objects.create_user(username='async-views')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(user)}'
+
+    def test_waiting_games_rejects_a_bad_cursor_like_the_sync_view(self):
+        path = '/api/waiting-games/?cursor=not-a-cursor'
+        sync_response = self.client.get(path)
+        with override_settings(ROOT_URLCONF=self.async_urlconf):
+            response = self.client.get(path)
+            self.assertIs(response.resolver_match.func, async_views.waiting_games)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.status_code, sync_response.status_code)
+        self.assertEqual(response.json(), sync_response.json())
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class SubmitGuessTests(TestCase):
+    def setUp(self):
+        self.alice = Player.objects.create_user(username='alice')
+        self.bob = Player.objects.create_user(username='bob')
+        self.game = Game.objects.create(player1=self.alice, player2=self.bob, word='banana', masked_word='______',
+                                        difficulty='easy', status='active', turn=self.alice)
+
+    def test_a_move_that_lost_the_race_is_rejected_with_409(self):
+        def check_then_move_elsewhere(game, player_id, letter):
+            check_guess(game, player_id, letter)
+            # حرکت دیگری بین خواندن و نوشتن ردیف بازی ثبت می‌شود
+            Game.objects.filter(pk=game.pk).update(version=F('version') + 1)
+
+        with mock.patch('api.guessing.check_guess', check_then_move_elsewhere):
+            with self.assertRaises(GuessError) as raised:
+                submit_guess(self.game.id, self.alice, 'a')
+
+        self.assertEqual(raised.exception.status, 409)
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.masked_word, self.game.version), ('______', 0))
+        self.assertFalse(Guess.objects.exists())
+
+    def test_a_letter_can_only_be_guessed_once(self):
+        client = APIClient()
+        for player, letter in ((self.alice, 'a'), (self.bob, 'z')):
+            client.force_authenticate(player)
+            response = client.post(f'/api/games/{self.game.id}/guess/', {'letter': letter}, format='json')
+            self.assertEqual(response.status_code, 200)
+
+        for letter in ('a', 'z', 'A'):
+            with self.subTest(letter=letter):
+                client.force_authenticate(self.alice)
+                response = client.post(f'/api/games/{self.game.id}/guess/', {'letter': letter}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Letter already guessed'})
+
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.masked_word, self.game.version), ('_a_a_a', 2))
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class AwardPlayersTests(TransactionTestCase):
+    def test_a_level_is_gained_every_xp_per_level(self):
+        player = Player.objects.create_user(username='almost-there', level=3, xp=XP_PER_LEVEL - 10, score=500)
+        with transaction.atomic():
+            award_players(types.SimpleNamespace(player1_id=player.id, player1_score=30, player2_id=None, player2_score=0))
+
+        player.refresh_from_db()
+        self.assertEqual((player.score, player.level, player.xp), (530, 4, 20))
+
+    def test_concurrent_awards_are_all_counted(self):
+        player = Player.objects.create_user(username='busy', xp=XP_PER_LEVEL - 5)
+        opponent = Player.objects.create_user(username='opponent')
+        games = [
+            types.SimpleNamespace(player1_id=player.id, player1_score=20, player2_id=opponent.id, player2_score=i)
+            for i in range(8)
+        ]
+        start = threading.Barrier(len(games))
+        errors = []
+
+        def finish(game):
+            try:
+                start.wait()
+                award_players(game)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=finish, args=(game,)) for game in games]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        player.refresh_from_db()
+        opponent.refresh_from_db()
+        # ۵ امتیاز تا سطح بعد مانده بود؛ ۱۶۰ امتیاز یعنی دو سطح و ۵۵ xp
+        self.assertEqual((player.score, player.level, player.xp), (160, 3, 55))
+        self.assertEqual((opponent.score, opponent.level, opponent.xp), (28, 1, 28))
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class GuessBatchTests(TestCase):
+    def setUp(self):
+        self.alice = Player.objects.create_user(username='alice')
+        self.bob = Player.objects.create_user(username='bob')
+        self.ai_game = Game.objects.create(player1=self.alice, word='banana', masked_word='______', difficulty='easy',
+                                           status='active', turn=self.alice, ai_level='easy')
+        self.bobs_turn = Game.objects.create(player1=self.alice, player2=self.bob, word='banana', masked_word='______',
+                                             difficulty='easy', status='active', turn=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def post_moves(self, moves):
+        return self.client.post('/api/games/guesses/', {
+            'moves': [{'game_id': game_id, 'letter': letter} for game_id, letter in moves],
+        }, format='json')
+
+    def test_moves_are_answered_in_order_and_errors_do_not_stop_the_batch(self):
+        moves = [
+            (self.ai_game.id, 'a'),
+            (self.bobs_turn.id, 'e'),
+            (self.bobs_turn.id + 1000, 'e'),
+            (self.ai_game.id, 'a'),
+            (self.ai_game.id, 'n'),
+        ]
+        # هوش مصنوعی بعد از هر حرکت حرف غلطی حدس می‌زند
+        with mock.patch('api.guessing.ai_player.choose', side_effect=['x', 'y']), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.post_moves(moves)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([(r['game_id'], r['letter']) for r in results], moves)
+        self.assertEqual([r.get('status') for r in results], [None, 403, 404, 400, None])
+        self.assertEqual([r.get('masked_word') for r in results], ['_a_a_a', None, None, None, '_anana'])
+        self.assertEqual(results[4]['ai_guesses'], [{'letter': 'y', 'correct': False}])
+
+        game_updates = [q['sql'] for q in queries.captured_queries if re.match(r'UPDATE "api_game"', q['sql'])]
+        self.assertEqual(len(game_updates), 1)
+        self.ai_game.refresh_from_db()
+        self.assertEqual((self.ai_game.masked_word, self.ai_game.version), ('_anana', 2))
+        self.assertEqual(
+            list(Guess.objects.filter(game=self.ai_game).order_by('id').values_list('letter', flat=True)),
+            ['a', 'x', 'n', 'y'],
+        )
+        self.bobs_turn.refresh_from_db()
+        self.assertEqual(self.bobs_turn.version, 0)
+
+    @override_settings(GUESS_BATCH_MAX_MOVES=2)
+    def test_the_number_of_moves_is_limited(self):
+        response = self.post_moves([(self.ai_game.id, letter) for letter in 'abn'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'moves': ['At most 2 moves per request']})
+        self.assertFalse(Guess.objects.exists())
+
+
+@override_settings(CACHES=LOCAL_CACHE, GAME_STATUS_POLL_INTERVAL=30)
+class GameStatusTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = Player.objects.create_user(username='alice')
+        self.bob = Player.objects.create_user(username='bob')
+        self.game = Game.objects.create(player1=self.alice, player2=self.bob, word='banana', masked_word='______',
+                                        difficulty='easy', status='active', turn=self.alice)
+        self.url = f'/api/games/{self.game.id}/status/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def test_unchanged_game_is_answered_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(etag, f'"{self.game.id}-0"')
+
+        for headers, path in (({'HTTP_IF_NONE_MATCH': etag}, self.url), ({}, f'{self.url}?version=0')):
+            with self.subTest(path=path, headers=headers):
+                response = self.client.get(path, **headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+        submit_guess(self.game.id, self.alice, 'a')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{self.game.id}-1"')
+        self.assertEqual((response.json()['masked_word'], response.json()['turn']), ('_a_a_a', 'bob'))
+
+    def test_long_poll_wakes_up_when_the_game_changes(self):
+        def guess():
+            time.sleep(0.3)
+            submit_guess(self.game.id, self.alice, 'a')
+            connection.close()
+
+        thread = threading.Thread(target=guess)
+        thread.start()
+        started = time.monotonic()
+        response = self.client.get(f'{self.url}?wait=10', HTTP_IF_NONE_MATCH=f'"{self.game.id}-0"')
+        elapsed = time.monotonic() - started
+        thread.join()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], 1)
+        # بیدار شدن با پیام broker، نه با GAME_STATUS_POLL_INTERVAL یا پایان wait
+        self.assertLess(elapsed, 5)
+
+    def test_long_poll_answers_304_when_the_wait_runs_out(self):
+        started = time.monotonic()
+        response = self.client.get(f'{self.url}?wait=0.3', HTTP_IF_NONE_MATCH=f'"{self.game.id}-0"')
+
+        self.assertEqual(response.status_code, 304)
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ArchiveGamesTests(TestCase):
+    def setUp(self):
+        self.alice = Player.objects.create_user(username='alice', score=100)
+        self.bob = Player.objects.create_user(username='bob', score=60)
+        now = timezone.now()
+        # هر بازی ده روز قبل از بعدی تمام شده؛ هفت بازی سی روز یا بیشتر پیش تمام شده‌اند و بایگانی می‌شوند
+        for i in range(10):
+            finished_at = now - timedelta(days=10 * i)
+            players = (self.alice, self.bob) if i % 2 else (self.bob, self.alice)
+            game = Game.objects.create(player1=players[0], player2=players[1], word='banana', masked_word='banana',
+                                       difficulty='easy', status='finished', player1_score=20 * (i % 3),
+                                       player2_score=20, started_at=finished_at - timedelta(minutes=5),
+                                       finished_at=finished_at)
+            Guess.objects.create(game=game, player=players[0], letter='b', correct=True)
+            PlayerStats.record_game(game)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def history(self, page_size=20):
+        rows, url = [], f'/api/history/?page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            rows += response.json()['results']
+            url = response.json()['next']
+        return rows
+
+    def archive(self):
+        call_command('archive_games', older_than_days=30, stdout=io.StringIO())
+
+    def test_history_and_profile_do_not_change(self):
+        history, profile = self.history(), self.client.get('/api/profile/').json()
+
+        self.archive()
+
+        self.assertEqual((Game.objects.count(), ArchivedGame.objects.count()), (3, 7))
+        self.assertEqual(Guess.objects.count(), 3)
+        self.assertEqual(set(ArchivedGame.objects.values_list('guesses', flat=True)), {'b'})
+        self.assertEqual(self.history(), history)
+        self.assertEqual(self.client.get('/api/profile/').json(), profile)
+
+    def test_history_pages_cross_from_games_to_archived_games(self):
+        expected = [row['id'] for row in self.history()]
+
+        self.archive()
+
+        for page_size in (1, 3, 4):
+            with self.subTest(page_size=page_size):
+                self.assertEqual([row['id'] for row in self.history(page_size)], expected)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.players = [Player.objects.create_user(username=f'ranked-{i}', score=10 * i) for i in range(3)]
+        # دو worker با یک کش مشترک
+        self.worker, self.other_worker = leaderboard, Leaderboard()
+        self.worker.invalidate()
+        self.worker.top()
+        self.other_worker.top()
+
+    def test_score_changes_reach_other_workers_without_a_reload(self):
+        player = self.players[0]
+        Player.objects.filter(pk=player.pk).update(score=100)
+        player.refresh_from_db()
+        self.worker.update(player)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.other_worker.top(1), [(1, 100, 0, player.id)])
+            self.assertEqual(self.other_worker.rank(player), 1)
+
+    def test_rank_uses_the_score_of_the_player_passed(self):
+        player = self.players[0]
+        player.score = 50
+
+        self.assertEqual(self.other_worker.rank(player), 1)
+        self.assertEqual(self.other_worker.top(1), [(1, 50, 0, player.id)])
+
+    def test_deleted_players_leave_every_worker_index(self):
+        player = self.players[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            player.delete()
+
+        with self.assertNumQueries(0):
+            ranked = [player_id for _, _, _, player_id in self.other_worker.top()]
+        self.assertEqual(ranked, [self.players[1].id, self.players[0].id])
+        self.assertNotIn(player.id, self.worker.index)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class WebsocketAuthenticationTests(TestCase):
+    def test_only_tokens_of_existing_active_players_are_accepted(self):
+        active = Player.objects.create_user(username='active')
+        inactive = Player.objects.create_user(username='inactive')
+        deleted = Player.objects.create_user(username='deleted')
+        tokens = {player.username: str(AccessToken.for_user(player)) for player in (active, inactive, deleted)}
+        # بازیکن‌ها پیش از تغییر در کش احراز هویت هستند
+        for player in (inactive, deleted):
+            self.assertEqual(async_to_sync(authenticate_token)(tokens[player.username]), player.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            inactive.is_active = False
+            inactive.save()
+            deleted.delete()
+
+        self.assertEqual(async_to_sync(authenticate_token)(tokens['active']), active.id)
+        for name, token in (('inactive', tokens['inactive']), ('deleted', tokens['deleted']), ('garbage', 'x.y.z')):
+            with self.subTest(name):
+                self.assertIsNone(async_to_sync(authenticate_token)(token))
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from api import async_views
+from api.metrics import metrics_view
 from api.views import RegisterAPIView, CreateGameAPIView, WaitingGamesAPIView, JoinGameAPIView, GuessLetterAPIView, \
     PauseGameAPIView, ResumeGameAPIView, ProfileAPIView, HistoryAPIView, LeaderboardAPIView, CancelGameAPIView, \
-    GameStatusAPIView, ProfileEditView
+    GameStatusAPIView, ProfileEditView, MatchmakingAPIView, GuessBatchAPIView, GameHintAPIView, \
+    PlayAIAPIView
 
 urlpatterns = [
     path('register/', RegisterAPIView.as_view(), name='register'),
@@ -16,19 +20,28 @@ urlpatterns = [
 
 
     path('create-game/', CreateGameAPIView.as_view(), name='create_game'),
-    path('waiting-games/', WaitingGamesAPIView.as_view(), name='waiting_games'),
+    path('waiting-games/', async_views.waiting_games if settings.API_ASYNC_VIEWS else WaitingGamesAPIView.as_view(),
+         name='waiting_games'),
     path("games/<int:game_id>/join/", JoinGameAPIView.as_view(), name='join_game'),
+    path('games/<int:game_id>/play-ai/', PlayAIAPIView.as_view(), name='play_ai'),
+    path('matchmaking/', MatchmakingAPIView.as_view(), name='matchmaking'),
 
 
-    path('games/<int:game_id>/guess/', GuessLetterAPIView.as_view(), name='guess_letter'),
+    path('games/<int:game_id>/guess/', async_views.guess_letter if settings.API_ASYNC_VIEWS else GuessLetterAPIView.as_view(),
+         name='guess_letter'),
+    path('games/guesses/', GuessBatchAPIView.as_view(), name='guess_batch'),
     path('games/<int:game_id>/cancel/', CancelGameAPIView.as_view(), name='cancel_game'),
-    path('games/<int:game_id>/status/', GameStatusAPIView.as_view(), name='game_status'),
+    path('games/<int:game_id>/status/', async_views.game_status if settings.API_ASYNC_VIEWS else GameStatusAPIView.as_view(),
+         name='game_status'),
+    path('games/<int:game_id>/hint/', GameHintAPIView.as_view(), name='game_hint'),
     path('games/<int:game_id>/pause/', PauseGameAPIView.as_view(), name='pause_game'),
     path('games/<int:game_id>/resume/', ResumeGameAPIView.as_view(), name='resume_game'),
 
 
     path('history/', HistoryAPIView.as_view(), name='game-history'),
-    path('leaderboard/', LeaderboardAPIView.as_view(), name='leaderboard'),
+    path('metrics/', metrics_view, name='metrics'),
+    path('leaderboard/', async_views.leaderboard_view if settings.API_ASYNC_VIEWS else LeaderboardAPIView.as_view(),
+         name='leaderboard'),
 
 ]
 
@@ -1,21 +1,45 @@
-from django.db.models import Q,F
-from rest_framework.generics import ListAPIView
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import Q,F,Value
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from api.models import Player, Word, Game, Guess
+from api.models import Player, Word, Game, PlayerStats, MatchTicket, ArchivedGame
+from api.leaderboard import SNAPSHOT_PERIODS, leaderboard, leaderboard_snapshots
+from api.word_pool import word_pool
+from api.realtime import publish_game, wait_for_game_change
+from api.guessing import GuessError, refresh_leaderboard, submit_guess, submit_guesses
+from api.engine import engine_snapshot, game_engine
+from api.letters import normalize_letter
+from api.ai import ai_player
+from api.pagination import KeysetPagination
+from api.fast_serializers import HISTORY_VALUES, WAITING_GAME_VALUES, game_data, history_rows, waiting_game_rows
+from api.matchmaking import MatchmakingError, cancel_match, find_match
 import random
+from django.conf import settings
 from django.utils import timezone
-from api.serializers import GameCreateSerializer, WaitingGameSerializer, GameSerializer, GameListSerializer, \
-    ProfileSerializer,PlayerSerializer
+from api.serializers import GameCreateSerializer, ProfileSerializer, PlayerSerializer, GuessBatchSerializer, \
+    PlayAISerializer
 from django.shortcuts import get_object_or_404
-from rest_framework.views import APIView
-from api.serializers import GameHistorySerializer, LeaderboardSerializer,GameSerializer
 from rest_framework import status, permissions
 
 
 
+def get_requested_fields(request):
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(',') if name.strip()]
+
+
+
+def release_engine_game(game_id):
+    # وضعیت بازی در موتور حافظه باید قبل از تغییر مستقیم در دیتابیس ذخیره شود
+    if settings.GAME_ENGINE_ENABLED:
+        game_engine.release(game_id)
+
+
+
 class RegisterAPIView(APIView):
     permission_classes = [AllowAny]
     def post(self, request, *args, **kwargs):
@@ -39,6 +63,8 @@ class RegisterAPIView(APIView):
             username=username,
             password=password
         )
+        leaderboard.update(player)
+        leaderboard_snapshots.refresh([player.id])
 
         return Response(
             {
@@ -63,14 +89,17 @@ class CreateGameAPIView(APIView):
             return Response(serializer.errors, status=400)
 
         difficulty = serializer.validated_data['difficulty']
-        words = Word.objects.filter(difficulty=difficulty)
+        real_word = word_pool.choose(
+            difficulty,
+            serializer.validated_data.get('min_score'),
+            serializer.validated_data.get('max_score'),
+        )
 
-        if not words.exists():
+        if not real_word:
             return Response({'error': 'No words found for this difficulty'}, status=400)
 
-        word_obj = random.choice(list(words))
-        real_word = word_obj.text.lower()
         masked_word = '_' * len(real_word)
+        ai_level = serializer.validated_data.get('ai_level', '')
 
 
         game = Game.objects.create(
@@ -78,7 +107,10 @@ class CreateGameAPIView(APIView):
             word=real_word,
             masked_word=masked_word,
             difficulty=difficulty,
-            status='waiting',
+            # بازی با هوش مصنوعی منتظر حریف نمی‌ماند
+            status='active' if ai_level else 'waiting',
+            started_at=timezone.now() if ai_level else None,
+            ai_level=ai_level,
             turn=request.user
         )
 
@@ -86,6 +118,8 @@ class CreateGameAPIView(APIView):
             'game_id': game.id,
             'word_length': len(real_word),
             'difficulty': game.difficulty,
+            'status': game.status,
+            'ai_level': game.ai_level or None,
 
         }, status=201)
 
@@ -93,7 +127,6 @@ class CreateGameAPIView(APIView):
 
 
 class WaitingGamesAPIView(APIView):
-    serializer_class = WaitingGameSerializer
     permission_classes = [IsAuthenticated]
 
 
@@ -104,10 +137,46 @@ class WaitingGamesAPIView(APIView):
             Q(status='waiting', player2__isnull=True) |
             Q(status='active', player1=user) |
             Q(status='active', player2=user)
-        )
+        ).values(*WAITING_GAME_VALUES)
 
-        serializer = self.serializer_class(games, many=True, context={'request': request})
-        return Response(serializer.data)
+        paginator = KeysetPagination('created_at')
+        page = paginator.paginate_queryset(games, request, view=self)
+        return paginator.get_paginated_response(waiting_game_rows(page, get_requested_fields(request)))
+
+
+
+class MatchmakingAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = GameCreateSerializer
+
+    def get(self, request):
+        ticket = MatchTicket.objects.filter(player=request.user).first()
+        if ticket is None:
+            return Response({'status': 'idle'}, status=200)
+        if ticket.game_id is None:
+            return Response({'status': 'waiting', 'difficulty': ticket.difficulty}, status=200)
+        game = Game.objects.select_related('player1', 'player2', 'turn').get(id=ticket.game_id)
+        return Response({'status': 'matched', 'game': game_data(game)}, status=200)
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        try:
+            game, ticket = find_match(request.user, serializer.validated_data['difficulty'])
+        except MatchmakingError as e:
+            return Response({'error': str(e)}, status=400)
+
+        if game is None:
+            return Response({'status': 'waiting', 'difficulty': ticket.difficulty}, status=202)
+        game = Game.objects.select_related('player1', 'player2', 'turn').get(id=game.id)
+        return Response({'status': 'matched', 'game': game_data(game)}, status=201)
+
+    def delete(self, request):
+        if not cancel_match(request.user):
+            return Response({'error': 'You are not waiting for a match'}, status=400)
+        return Response({'message': 'Left the matchmaking queue'}, status=200)
 
 
 
@@ -115,7 +184,8 @@ class JoinGameAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, game_id, *args, **kwargs):
-        game = get_object_or_404(Game, id=game_id)
+        release_engine_game(game_id)
+        game = get_object_or_404(Game.objects.select_related('player1'), id=game_id)
 
         if game.status != 'waiting':
             return Response({'error': 'You cannot join this game'}, status=400)
@@ -123,121 +193,110 @@ class JoinGameAPIView(APIView):
         if game.player1 == request.user:
             return Response({'error': 'You cannot join your own game'}, status=400)
 
-        if game.player2:
+        if game.player2_id:
             return Response({'error': 'Game already has two players'}, status=400)
 
-        game.player2 = request.user
-        game.status = 'active'
-        game.started_at = timezone.now()
+        # اگر بازی بین خواندن و نوشتن تغییر کرده باشد، به‌روزرسانی انجام نمی‌شود
+        started_at = timezone.now()
+        turn = random.choice([game.player1, request.user])
+        updated = Game.objects.filter(pk=game.pk, status='waiting', player2__isnull=True, version=game.version).update(
+            player2=request.user,
+            status='active',
+            started_at=started_at,
+            turn=turn,
+            version=F('version') + 1,
+        )
+        if not updated:
+            return Response({'error': 'The game was changed by another request, please retry'}, status=409)
 
-        game.turn = random.choice([game.player1, game.player2])
-        game.save()
+        game.player2, game.turn = request.user, turn
+        game.status, game.started_at = 'active', started_at
+        game.version += 1
+        publish_game(game)
 
-        serializer = GameSerializer(game)
-        return Response(serializer.data, status=200)
+        return Response(game_data(game), status=200)
 
 
 
 
 
-class GuessLetterAPIView(APIView):
+class PlayAIAPIView(APIView):
+    """Start a waiting game against the AI instead of waiting for a second player."""
     permission_classes = [IsAuthenticated]
 
     def post(self, request, game_id):
-        letter = request.data.get('letter', '').lower()
-        if not letter or len(letter) != 1 or not letter.isalpha():
-            return Response({'error': 'Invalid letter'}, status=400)
+        serializer = PlayAISerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
 
-        game = get_object_or_404(Game, id=game_id)
+        release_engine_game(game_id)
+        game = get_object_or_404(Game.objects.select_related('player1'), id=game_id)
 
-        if game.status != 'active':
-            return Response({'error': 'Game is not active'}, status=400)
+        if game.player1_id != request.user.id:
+            return Response({'error': 'Only the creator can play this game against the AI'}, status=403)
 
-        if game.turn != request.user:
-            return Response({'error': 'It is not your turn'}, status=403)
+        # اگر بازیکن دیگری هم‌زمان وارد بازی شده باشد، به‌روزرسانی انجام نمی‌شود
+        started_at = timezone.now()
+        updated = Game.objects.filter(id=game.id, status='waiting', player2__isnull=True).update(
+            status='active', started_at=started_at, ai_level=serializer.validated_data['ai_level'],
+            turn=request.user, version=F('version') + 1,
+        )
+        if not updated:
+            return Response({'error': 'Game is not waiting for a player'}, status=400)
 
-        if game.guesses.filter(letter=letter).exists():
-            return Response({'error': 'Letter already guessed'}, status=400)
+        game.refresh_from_db(fields=['status', 'started_at', 'ai_level', 'turn', 'version'])
+        publish_game(game)
+        return Response(game_data(game), status=200)
 
-        real_word = game.word
-        masked = list(game.masked_word)
-        correct = False
 
-        for i, c in enumerate(real_word):
-            if c == letter:
-                masked[i] = letter
-                correct = True
 
-        Guess.objects.create(game=game, player=request.user, letter=letter, correct=correct)
 
-        game.masked_word = ''.join(masked)
+class GuessLetterAPIView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        is_player1 = (game.player1 == request.user)
+    def post(self, request, game_id):
+        letter = normalize_letter(request.data.get('letter', ''))
+        if not letter or len(letter) != 1 or not letter.isalpha():
+            return Response({'error': 'Invalid letter'}, status=400)
 
-        if correct:
-            if is_player1:
-                game.player1_score += 20
-            else:
-                game.player2_score += 20
-        else:
-            if is_player1:
-                game.player1_score = max(0, game.player1_score - 20)
+        try:
+            if settings.GAME_ENGINE_ENABLED:
+                result = game_engine.guess(game_id, request.user, letter)
             else:
-                game.player2_score = max(0, game.player2_score - 20)
+                result = submit_guess(game_id, request.user, letter)
+        except GuessError as e:
+            return Response({'error': e.message}, status=e.status)
 
-        if game.masked_word == game.word:
-            game.status = 'finished'
+        return Response(result)
 
-            if game.player1_score > game.player2_score:
-                game.turn = game.player1  # برنده بازی
-            elif game.player2_score > game.player1_score:
-                game.turn = game.player2
-            else:
-                game.turn = None  # مساوی
-
-            # بروزرسانی امتیاز و XP بازیکنان
-            player1 = game.player1
-            player2 = game.player2
-
-            # افزودن امتیاز بازی به امتیاز کلی بازیکنان
-            player1.score += game.player1_score
-            player2_score = game.player2_score if player2 else 0
-            if player2:
-                player2.score += player2_score
-
-            # بروزرسانی XP و بررسی سطح
-            # مثلاً هر 100 XP سطح یک درجه افزایش می‌یابد
-            def update_player_level(player, gained_xp):
-                player.xp += gained_xp
-                while player.xp >= 100:
-                    player.xp -= 100
-                    player.level += 1
-
-            update_player_level(player1, game.player1_score)
-            if player2:
-                update_player_level(player2, player2_score)
-
-            player1.save()
-            if player2:
-                player2.save()
 
-        else:
-            game.turn = game.player2 if game.turn == game.player1 else game.player1
 
-        game.save()
 
-        your_game_score = game.player1_score if is_player1 else game.player2_score
+class GuessBatchAPIView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            'masked_word': game.masked_word,
-            'correct': correct,
-            'next_turn': game.turn.username if game.status != 'finished' and game.turn else None,
-            'game_status': game.status,
-            'your_score': your_game_score,
-            'player1_score': game.player1_score,
-            'player2_score': game.player2_score,
-            'winner': game.turn.username if game.status == 'finished' and game.turn else None
-        })
+    def post(self, request):
+        serializer = GuessBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        moves = [(move['game_id'], move['letter']) for move in serializer.validated_data['moves']]
+
+        if settings.GAME_ENGINE_ENABLED:
+            results = []
+            for game_id, letter in moves:
+                try:
+                    results.append(game_engine.guess(game_id, request.user, letter))
+                except GuessError as e:
+                    results.append({'error': e.message, 'status': e.status})
+        else:
+            try:
+                results = submit_guesses(request.user, moves)
+            except GuessError as e:
+                return Response({'error': e.message}, status=e.status)
+
+        return Response({'results': [
+            {'game_id': game_id, 'letter': letter, **result} for (game_id, letter), result in zip(moves, results)
+        ]})
 
 
 
@@ -247,13 +306,25 @@ class CancelGameAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, game_id):
+        release_engine_game(game_id)
         game = get_object_or_404(Game, id=game_id)
 
         if request.user != game.player1 and request.user != game.player2:
             return Response({'error': 'You are not part of this game'}, status=403)
 
-        game.status = 'finished'
-        game.save()
+        with transaction.atomic():
+            # فقط یک درخواست (لغو یا حدس آخر) می‌تواند بازی را تمام کند
+            updated = Game.objects.filter(pk=game.pk).exclude(status='finished').update(
+                status='finished', finished_at=timezone.now(), version=F('version') + 1,
+            )
+            if not updated:
+                return Response({'error': 'Game is already finished'}, status=400)
+            game.refresh_from_db()
+            PlayerStats.record_game(game)
+            MatchTicket.objects.filter(game=game).delete()
+            player_ids = [player_id for player_id in (game.player1_id, game.player2_id) if player_id]
+            transaction.on_commit(lambda: refresh_leaderboard(player_ids, game))
+            publish_game(game)
         return Response({'message': 'Game cancelled'}, status=200)
 
 
@@ -263,52 +334,144 @@ class GameStatusAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, game_id):
-        game = get_object_or_404(Game, id=game_id)
+        game_row = self.load_game_row(game_id)
 
-        # فقط بازیکن‌های داخل بازی دسترسی دارند
-        if request.user != game.player1 and (game.player2 and request.user != game.player2):
+        if not self.is_player(request.user, game_row):
             return Response({'error': 'You are not part of this game'}, status=403)
 
+        known_version = self.get_known_version(request, game_id)
+        version = game_row['version']
+
+        wait = self.get_wait(request)
+        if wait and known_version == version:
+            version = async_to_sync(wait_for_game_change)(game_id, known_version, wait)
+
+        if known_version is not None and version == known_version:
+            return Response(status=304, headers={'ETag': f'"{game_id}-{version}"'})
+
+        game, usernames = self.load_game(game_id)
+        return Response(self.get_status_data(request.user, game, usernames), status=200, headers={'ETag': game.etag})
+
+    @staticmethod
+    def load_game_row(game_id):
+        # بازی‌ای که در موتور حافظه است از همان‌جا خوانده می‌شود؛ ردیف دیتابیس آن عقب‌تر است
+        state = engine_snapshot(game_id)
+        if state is not None:
+            return {'version': state.version, 'player1_id': state.player1_id, 'player2_id': state.player2_id}
+        return get_object_or_404(Game.objects.values('version', 'player1_id', 'player2_id'), id=game_id)
+
+    @classmethod
+    def load_game(cls, game_id):
+        """The game, from the engine when it holds it, and a map of its players' ids to usernames."""
+        state = engine_snapshot(game_id)
+        if state is not None:
+            return state, state.usernames
+        game = get_object_or_404(Game.objects.select_related('player1', 'player2'), id=game_id)
+        return game, cls.get_usernames(game)
+
+    @staticmethod
+    def get_usernames(game):
+        return {player.id: player.username for player in (game.player1, game.player2) if player}
+
+    @classmethod
+    def get_status_data(cls, user, game, usernames):
         # محاسبه برنده اگر بازی تمام شده باشد
         winner = None
         if game.status == 'finished':
             if game.player1_score > game.player2_score:
-                winner = game.player1.username
+                winner = usernames.get(game.player1_id)
             elif game.player2_score > game.player1_score:
-                winner = game.player2.username
+                winner = usernames.get(game.player2_id, 'AI')
             # else: مساوی
 
-        data = {
+        return {
             'game_id': game.id,
             'status': game.status,
-            'player1': game.player1.username if game.player1 else None,
-            'player2': game.player2.username if game.player2 else None,
-            'turn': game.turn.username if game.turn else None,
+            'player1': usernames.get(game.player1_id),
+            'player2': usernames.get(game.player2_id),
+            'turn': usernames.get(game.turn_id),
             'masked_word': game.masked_word,
-            'your_score': self.get_player_score(request.user, game),
+            'your_score': cls.get_player_score(user, game),
             'player1_score': game.player1_score,
             'player2_score': game.player2_score,
-            'winner': winner
+            'winner': winner,
+            'version': game.version,
         }
-        return Response(data, status=200)
 
-    def get_player_score(self, user, game):
-        if user == game.player1:
+    @staticmethod
+    def is_player(user, game_row):
+        # فقط بازیکن‌های داخل بازی دسترسی دارند
+        return not (user.id != game_row['player1_id'] and (game_row['player2_id'] and user.id != game_row['player2_id']))
+
+    @staticmethod
+    def get_player_score(user, game):
+        if user.id == game.player1_id:
             return game.player1_score
-        elif user == game.player2:
+        elif user.id == game.player2_id:
             return game.player2_score
         return 0
 
+    @staticmethod
+    def get_known_version(request, game_id):
+        # نسخه‌ای که کلاینت دارد: از If-None-Match یا پارامتر ?version=
+        etag = request.headers.get('If-None-Match', '').strip().removeprefix('W/').strip('"')
+        prefix = f'{game_id}-'
+        if etag.startswith(prefix) and etag[len(prefix):].isdigit():
+            return int(etag[len(prefix):])
+        version = request.GET.get('version', '')
+        return int(version) if version.isdigit() else None
+
+    @staticmethod
+    def get_wait(request):
+        try:
+            wait = float(request.GET.get('wait', 0))
+        except ValueError:
+            return 0
+        return min(max(wait, 0), getattr(settings, 'GAME_STATUS_MAX_WAIT', 30))
 
 
 
 
 
 
+
+class GameHintAPIView(APIView):
+    """
+    The letter contained in the most dictionary words that still fit the
+    masked word and the wrong guesses; the answer itself is never consulted.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id):
+        # بازی در موتور حافظه فقط خوانده می‌شود و از آن بیرون نمی‌آید
+        game = engine_snapshot(game_id)
+        if game is None:
+            game = get_object_or_404(
+                Game.objects.only('id', 'player1_id', 'player2_id', 'status', 'turn_id', 'difficulty',
+                                  'masked_word', 'guessed_letters', 'other_letters'),
+                id=game_id,
+            )
+
+        if request.user.id not in (game.player1_id, game.player2_id):
+            return Response({'error': 'You are not part of this game'}, status=403)
+
+        if game.status != 'active':
+            return Response({'error': 'Game is not active'}, status=400)
+
+        if game.turn_id != request.user.id:
+            return Response({'error': 'It is not your turn'}, status=403)
+
+        letter = ai_player.best_letter(game)
+        return Response({'game_id': game.id, 'letter': letter}, status=200)
+
+
+
+
 class PauseGameAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, game_id):
+        release_engine_game(game_id)
         game = get_object_or_404(Game, id=game_id)
 
         if request.user != game.player1 and request.user != game.player2:
@@ -317,8 +480,9 @@ class PauseGameAPIView(APIView):
         if game.status != 'active':
             return Response({'error': 'Game is not active'}, status=400)
 
-        game.status = 'paused'
-        game.save()
+        if not game.change_status('active', 'paused'):
+            return Response({'error': 'The game was changed by another request, please retry'}, status=409)
+        publish_game(game)
         return Response({'message': 'Game paused'}, status=200)
 
 
@@ -329,6 +493,7 @@ class ResumeGameAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, game_id):
+        release_engine_game(game_id)
         game = get_object_or_404(Game, id=game_id)
 
         if request.user != game.player1 and request.user != game.player2:
@@ -337,8 +502,9 @@ class ResumeGameAPIView(APIView):
         if game.status != 'paused':
             return Response({'error': 'Game is not paused'}, status=400)
 
-        game.status = 'active'
-        game.save()
+        if not game.change_status('paused', 'active'):
+            return Response({'error': 'The game was changed by another request, please retry'}, status=409)
+        publish_game(game)
         return Response({'message': 'Game resumed'}, status=200)
 
 
@@ -348,37 +514,15 @@ class ProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
+        # کاربر احراز هویت‌شده از کش است؛ امتیاز و آمار باید تازه خوانده شوند
+        user = Player.objects.select_related('stats').get(pk=request.user.pk)
 
-        finished_games = Game.objects.filter(
-            (Q(player1=user) | Q(player2=user)) & Q(status='finished')
-        )
-
-        total_games = finished_games.count()
-        wins = 0
-        losses = 0
-
-        for game in finished_games:
-            if game.player1_score > game.player2_score:
-                if user == game.player1:
-                    wins += 1
-                else:
-                    losses += 1
-            elif game.player2_score > game.player1_score:
-                if user == game.player2:
-                    wins += 1
-                else:
-                    losses += 1
-            else:
-                # مساوی حساب میشه، اگر خواستی اضافه کن
-                pass
+        stats = PlayerStats.for_player(user)
 
-        win_rate = round((wins / total_games) * 100, 2) if total_games > 0 else 0.0
-
-        user.games_played = total_games
-        user.wins = wins
-        user.losses = losses
-        user.win_rate = f"{win_rate}%"
+        user.games_played = stats.games_played
+        user.wins = stats.wins
+        user.losses = stats.losses
+        user.win_rate = f"{stats.win_rate}%"
 
         serializer = ProfileSerializer(user)
         return Response(serializer.data)
@@ -392,9 +536,19 @@ class HistoryAPIView(APIView):
 
     def get(self, request):
         user = request.user
-        games = Game.objects.filter(Q(player1=user) | Q(player2=user)).order_by('-started_at')
-        serializer = GameHistorySerializer(games, many=True, context={'request': request})
-        return Response(serializer.data)
+        archived_values = [name for name in HISTORY_VALUES if name != 'status']
+        # هر طرف بازی جداگانه خوانده می‌شود تا صفحه با اندیس (player, -started_at) و بدون مرتب‌سازی کل تاریخچه پیدا شود
+        querysets = [
+            queryset
+            for side in ('player1', 'player2')
+            for queryset in (
+                Game.objects.filter(**{side: user}).values(*HISTORY_VALUES),
+                ArchivedGame.objects.filter(**{side: user}).values(*archived_values, status=Value('finished')),
+            )
+        ]
+        paginator = KeysetPagination('started_at', descending=True)
+        page = paginator.paginate_querysets(querysets, request)
+        return paginator.get_paginated_response(history_rows(page, user.id, get_requested_fields(request)))
 
 
 
@@ -403,9 +557,20 @@ class LeaderboardAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        top_players = Player.objects.order_by('-score', '-xp')[:10]
-        serializer = LeaderboardSerializer(top_players, many=True)
-        return Response(serializer.data)
+        difficulty, period, error = self.get_board(request)
+        if error:
+            return Response({'error': error}, status=400)
+        return Response(leaderboard_snapshots.get(difficulty, period))
+
+    @staticmethod
+    def get_board(request):
+        difficulty = request.GET.get('difficulty') or None
+        period = request.GET.get('period') or 'all'
+        if difficulty is not None and difficulty not in dict(Word.DIFFICULTY_CHOICES):
+            return None, None, 'Invalid difficulty'
+        if period not in SNAPSHOT_PERIODS:
+            return None, None, f'period must be one of: {", ".join(SNAPSHOT_PERIODS)}'
+        return difficulty, period, None
 
 
 
@@ -417,14 +582,17 @@ class ProfileEditView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        player = request.user
+        player = Player.objects.get(pk=request.user.pk)
         serializer = PlayerSerializer(player)
         return Response(serializer.data)
 
     def put(self, request):
-        player = request.user
+        player = Player.objects.get(pk=request.user.pk)
         serializer = PlayerSerializer(player, data=request.data, partial=True)  # partial=True یعنی فقط فیلدهای ارسال شده آپدیت میشن
         if serializer.is_valid():
+            username = player.username
             serializer.save()
+            if player.username != username:
+                leaderboard_snapshots.invalidate()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
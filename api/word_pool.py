@@ -0,0 +1,107 @@
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from api.letters import normalize_word
+from api.models import Word
+
+
+GENERATION_CACHE_KEY = 'word_pool:generation'
+
+
+class WordPool:
+    """
+    Per-difficulty tuples of normalized word texts, loaded once per process.
+
+    Texts are ordered by Word.score, with the scores of the scored ones kept
+    alongside, so a word within a score band is picked with two bisections.
+
+    Invalidation is signalled through a generation number in the cache, so a
+    Word change made by any process sharing that cache (see CACHES) reaches
+    the others on their next pick. Pools are also reloaded after
+    WORD_POOL_REFRESH_SECONDS, which bounds how stale a worker can be when the
+    cache is not shared. With WORD_POOL_SHARED enabled the tuples themselves
+    are also stored in the cache and workers load them from there instead of
+    querying Word.
+    """
+
+    def __init__(self):
+        self._pools = {}
+        self._generation = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def refresh_seconds(self):
+        return getattr(settings, 'WORD_POOL_REFRESH_SECONDS', 300)
+
+    @property
+    def shared(self):
+        return getattr(settings, 'WORD_POOL_SHARED', False)
+
+    def _pool_cache_key(self, difficulty, generation):
+        return f'word_pool:{generation}:{difficulty}:scored'
+
+    def _load(self, difficulty, generation):
+        if self.shared:
+            pool = cache.get(self._pool_cache_key(difficulty, generation))
+            if pool is not None:
+                return pool
+        rows = Word.objects.filter(difficulty=difficulty).order_by(
+            F('score').asc(nulls_last=True), 'id'
+        ).values_list('text', 'score')
+        texts, scores = [], []
+        for text, score in rows.iterator(chunk_size=5000):
+            texts.append(normalize_word(text))
+            if score is not None:
+                scores.append(score)
+        # کلمه‌های بدون امتیاز در انتهای texts هستند و scores فقط ابتدای آن را پوشش می‌دهد
+        pool = (tuple(texts), tuple(scores))
+        if self.shared:
+            cache.set(self._pool_cache_key(difficulty, generation), pool, self.refresh_seconds or None)
+        return pool
+
+    def _pool(self, difficulty):
+        generation = cache.get(GENERATION_CACHE_KEY, 0)
+        now = time.monotonic()
+        with self._lock:
+            expired = bool(self.refresh_seconds) and now - (self._loaded_at or now) > self.refresh_seconds
+            if generation != self._generation or expired:
+                self._pools = {}
+                self._generation = generation
+                self._loaded_at = now
+            pool = self._pools.get(difficulty)
+            if pool is None:
+                pool = self._pools[difficulty] = self._load(difficulty, generation)
+        return pool
+
+    def get(self, difficulty):
+        return self._pool(difficulty)[0]
+
+    def choose(self, difficulty, min_score=None, max_score=None):
+        """A random word of ``difficulty``; with a score bound, only scored words within it."""
+        words, scores = self._pool(difficulty)
+        start, stop = 0, len(words)
+        if min_score is not None or max_score is not None:
+            start = bisect_left(scores, min_score) if min_score is not None else 0
+            stop = bisect_right(scores, max_score) if max_score is not None else len(scores)
+        if start >= stop:
+            return None
+        return words[random.randrange(start, stop)]
+
+    def invalidate(self):
+        try:
+            cache.incr(GENERATION_CACHE_KEY)
+        except ValueError:
+            cache.set(GENERATION_CACHE_KEY, 1, None)
+        with self._lock:
+            self._pools = {}
+            self._generation = None
+
+
+word_pool = WordPool()
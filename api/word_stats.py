@@ -0,0 +1,26 @@
+"""
+Letter statistics over the Word table and the per-word difficulty derived
+from them (see the compute_word_stats command).
+
+A letter's frequency is the share of words that contain it. A word's raw
+difficulty is the surprisal, -log2(frequency), summed over its distinct
+letters: more distinct letters, and rarer ones, mean more guesses. Word.score
+stores that raw value as a 0-100 percentile over the whole table.
+"""
+
+import math
+from collections import Counter
+
+
+def letter_frequencies(texts):
+    """``({letter: share of words containing it}, number of words)`` over an iterable of texts."""
+    counts = Counter()
+    total = 0
+    for text in texts:
+        counts.update(set(text))
+        total += 1
+    return {letter: count / total for letter, count in counts.items()}, total
+
+
+def raw_difficulty(word, frequencies):
+    return sum(-math.log2(frequencies.get(letter, 1.0)) for letter in set(word))
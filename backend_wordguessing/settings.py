@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,12 +79,89 @@ WSGI_APPLICATION = 'backend_wordguessing.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_PROFILE picks the backend:
+#   sqlite-basic  Django's default SQLite settings (the default, so commands
+#                 run against the committed db.sqlite3 leave its journal
+#                 mode alone)
+#   sqlite        WAL journal, synchronous=NORMAL, mmap and a busy timeout;
+#                 transactions start with BEGIN IMMEDIATE so concurrent
+#                 writers queue for the lock instead of failing on upgrade.
+#                 WAL mode is stored in the database file, so point
+#                 SQLITE_PATH at a database of its own when serving with it
+#   postgres      POSTGRES_* connection, persistent connections with health
+#                 checks, or a psycopg connection pool with DATABASE_POOL=1
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite-basic')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '60'))
+
+if DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'wordguessing'),
+            'USER': os.environ.get('POSTGRES_USER', 'wordguessing'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DATABASE_POOL', '') == '1':
+        # در حالت pool اتصال‌ها را خود pool نگه می‌دارد و CONN_MAX_AGE باید صفر باشد
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '20')),
+        }
+elif DATABASE_PROFILE in ('sqlite', 'sqlite-basic'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+    if DATABASE_PROFILE == 'sqlite':
+        DATABASES['default']['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20')),
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        }
+else:
+    raise ImproperlyConfigured(f'Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+
+# The word pool, leaderboard and cached users are invalidated through
+# generation numbers and keys in this cache, so it has to be shared by every
+# worker and by manage.py commands. CACHE_URL=redis://... uses Redis (needs
+# the "redis" package); otherwise a file cache in CACHE_DIR is shared by the
+# processes of one host.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / '.cache'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
     }
-}
 
 
 # Password validation
@@ -127,9 +208,92 @@ AUTH_USER_MODEL = 'api.Player'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
+
+# اندازه‌ی پیش‌فرض صفحه برای history و waiting-games (?page_size= تا ۱۰۰)
+GAME_LIST_PAGE_SIZE = 20
+
+# Live game updates pushed over /ws/games/<id>/ (see api/realtime.py).
+# Use 'api.realtime.RedisBroker' with {'url': ...} when running several ASGI nodes.
+GAME_BROKER = 'api.realtime.InMemoryBroker'
+GAME_BROKER_OPTIONS = {}
+
+# Long-poll mode of /api/games/<id>/status/?wait=N. Waiters are woken by the
+# game's broker channel; the poll interval only bounds how late they notice
+# changes the broker does not deliver to them (another process with the
+# in-memory broker).
+GAME_STATUS_MAX_WAIT = 30
+GAME_STATUS_POLL_INTERVAL = 5
+
+# Guess audit log: 'sync' inserts inside the guess transaction, 'batch'
+# buffers committed guesses and inserts them with bulk_create.
+GUESS_LOG_MODE = 'sync'
+GUESS_LOG_BATCH_SIZE = 500
+GUESS_LOG_FLUSH_INTERVAL = 1.0
+
+# Matchmaking only pairs players whose levels fall in the same band of this
+# many levels; 0 pairs any levels.
+MATCHMAKING_LEVEL_BAND_SIZE = 0
+
+# Serve guess, game status, waiting games and leaderboard with the async views
+# in api/async_views.py (only useful when running under ASGI, e.g. uvicorn).
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS', '') == '1'
+
+# In-memory game engine with write-behind persistence (api/engine.py).
+# Requires all requests of a game to reach the same process.
+GAME_ENGINE_ENABLED = os.environ.get('GAME_ENGINE_ENABLED', '') == '1'
+GAME_ENGINE_SHARDS = 16
+GAME_ENGINE_FLUSH_INTERVAL = 0.5
+GAME_ENGINE_BATCH_SIZE = 500
+
+# End-of-game work (scores, stats, leaderboard): 'sync' does it inside the
+# finishing guess; 'background' records it as a GameFinishTask, does it on
+# api.tasks after the response, and `manage.py run_finish_tasks` (run it
+# from cron) does whatever a worker did not finish.
+GAME_FINISH_MODE = os.environ.get('GAME_FINISH_MODE', 'sync')
+BACKGROUND_TASK_WORKERS = 2
+
+# Per-view metrics at /api/metrics/ (Prometheus text format) and Server-Timing
+# headers, recorded by api.middleware.PerformanceMiddleware. The query budget
+# is either one number for every view or a dict of URL name -> budget with an
+# optional 'default'.
+PERFORMANCE_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+PERFORMANCE_QUERY_BUDGET = {
+    'default': 25,
+    'waiting_games': 2,
+    'game-history': 5,
+    'leaderboard': 6,
+    'profile': 2,
+}
+
+# Cached leaderboard boards (api.leaderboard.LeaderboardSnapshots): entries
+# per board and how long an unchanged board stays in the cache. Boards are
+# patched in the shared cache when a game finishes; the timeout bounds how
+# long a patch lost to a concurrent one (or made in an unshared cache) shows.
+LEADERBOARD_SIZE = 10
+LEADERBOARD_SNAPSHOT_TIMEOUT = 60
+
+# Score changes reach the other workers' rank index (api.leaderboard.Leaderboard)
+# through a change log in the cache. Entries are kept this long; a worker that
+# has not read the log for as long reloads the index from the Player table.
+LEADERBOARD_CHANGE_LOG_SECONDS = 3600
+
+# How long api.authentication.CachedJWTAuthentication keeps a token's user
+# in the cache (0 loads it from the database on every request).
+AUTH_USER_CACHE_SECONDS = 60
+
+# Finished games older than this are moved to ArchivedGame by
+# `manage.py archive_games` (run it from cron).
+GAME_ARCHIVE_AFTER_DAYS = 30
+
+# Largest number of moves accepted by POST /api/games/guesses/.
+GUESS_BATCH_MAX_MOVES = 100
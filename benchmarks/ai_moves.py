@@ -0,0 +1,101 @@
+"""
+Latency of the AI opponent's moves (api.ai) over a synthetic dictionary.
+
+Builds the bitset index over N random words, then lets the AI play whole
+games against itself, one letter at a time, and reports the index build
+time and move latency percentiles per level. Everything runs in memory, so
+no database is touched.
+
+    python benchmarks/ai_moves.py --words 1000000 --games 200
+
+The AI's word is drawn from the dictionary, so every game must finish; a
+hard AI is also checked to need fewer wrong guesses than an easy one.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import percentile, setup_django  # noqa: E402
+
+
+def build_words(count, seed):
+    rng = random.Random(seed)
+    # حروف با توزیع نزدیک به انگلیسی، تا شاخص شبیه یک واژه‌نامه‌ی واقعی باشد
+    letters = 'eeeeeeeeeeeeaaaaaaaaarrrrrrrriiiiiiiooooooottttttnnnnnnssssssllllllccccuuuuddddpppmmmhhhggbbffyywkvxzjq'
+    return tuple(''.join(rng.choice(letters) for _ in range(rng.randint(4, 12))) for _ in range(count))
+
+
+class Game:
+    """The state api.ai.AIPlayer reads: a masked word and the guessed letters."""
+
+    def __init__(self, word, level):
+        self.word = word
+        self.masked_word = '_' * len(word)
+        self.difficulty = 'easy'
+        self.ai_level = level
+        self.guessed_letters = 0
+        self.other_letters = ''
+
+
+def play(ai, game, latencies):
+    from api.letters import letter_bit, reveal
+
+    wrong = 0
+    while game.masked_word != game.word:
+        started = time.perf_counter()
+        letter = ai.choose(game)
+        latencies.append(time.perf_counter() - started)
+        if game.guessed_letters & letter_bit(letter):
+            raise RuntimeError(f'{letter!r} guessed twice in {game.word!r}')
+        game.guessed_letters |= letter_bit(letter)
+        game.masked_word, correct = reveal(game.word, game.masked_word, letter)
+        wrong += not correct
+    return wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=200000)
+    parser.add_argument('--games', type=int, default=100, help='games played per level')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup_django()
+    from api.ai import LEVELS, AIPlayer, DifficultyIndex
+
+    words = build_words(args.words, args.seed)
+    index = DifficultyIndex(words)
+    started = time.perf_counter()
+    lengths = sorted({len(word) for word in words})
+    for length in lengths:
+        index.for_length(length)
+    print(f'index of {len(words):,} words ({len(lengths)} lengths) built in {time.perf_counter() - started:.2f} s')
+
+    class BenchAIPlayer(AIPlayer):
+        def index(self, difficulty):
+            return index
+
+    rng = random.Random(args.seed)
+    targets = [rng.choice(words) for _ in range(args.games)]
+    wrong_guesses = {}
+    print(f'{"level":<8} {"moves":>7} {"wrong/game":>11} {"p50 us":>8} {"p95 us":>8} {"p99 us":>8} {"max us":>8}')
+    for level in LEVELS:
+        ai = BenchAIPlayer(rng=random.Random(args.seed))
+        latencies = []
+        wrong = sum(play(ai, Game(word, level), latencies) for word in targets)
+        wrong_guesses[level] = wrong / args.games
+        print(f'{level:<8} {len(latencies):>7} {wrong_guesses[level]:>11.2f} '
+              f'{percentile(latencies, 0.50) * 1e6:>8.1f} {percentile(latencies, 0.95) * 1e6:>8.1f} '
+              f'{percentile(latencies, 0.99) * 1e6:>8.1f} {max(latencies) * 1e6:>8.1f}')
+
+    if wrong_guesses['hard'] >= wrong_guesses['easy']:
+        sys.exit('the hard AI made as many wrong guesses as the easy one')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Requests/sec and p99 latency of the hot endpoints under gunicorn (WSGI, the
+sync APIViews) versus uvicorn (ASGI, API_ASYNC_VIEWS=1).
+
+    python benchmarks/asgi_vs_wsgi.py --concurrency 64 --duration 10
+
+Requires gunicorn and uvicorn to be installed. Runs on a temporary SQLite
+database and cache unless SQLITE_PATH or DATABASE_PROFILE=postgres names one.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    BENCH_PREFIX, Client, access_token, cleanup, free_port, run_load, setup_django, start_server, stop_server,
+    summarize, use_scratch_database,
+)
+
+
+def seed(games):
+    from api.models import Game, Player, Word
+
+    player1 = Player.objects.create_user(username=f'{BENCH_PREFIX}async-1', password='bench')
+    player2 = Player.objects.create_user(username=f'{BENCH_PREFIX}async-2', password='bench')
+    word = Word.objects.filter(difficulty='easy').values_list('text', flat=True).first() or 'benchmark'
+    game_ids = [
+        Game.objects.create(
+            player1=player1, player2=player2, word=word, masked_word='_' * len(word),
+            difficulty='easy', status='active', turn=player1,
+        ).id
+        for _ in range(games)
+    ]
+    return access_token(player1), game_ids
+
+
+def servers(workers, threads):
+    return {
+        'wsgi (gunicorn)': (
+            ['gunicorn', 'backend_wordguessing.wsgi:application', '--workers', str(workers),
+             '--threads', str(threads), '--bind', '127.0.0.1:{port}'],
+            {'API_ASYNC_VIEWS': '0'},
+        ),
+        'asgi (uvicorn)': (
+            ['uvicorn', 'backend_wordguessing.asgi:application', '--workers', str(workers),
+             '--no-access-log', '--port', '{port}'],
+            {'API_ASYNC_VIEWS': '1'},
+        ),
+    }
+
+
+def run(args):
+    from django.core.management import call_command
+
+    setup_django()
+    call_command('migrate', verbosity=0)
+    token, game_ids = seed(args.games)
+    endpoints = {
+        'game status': lambda: f'/api/games/{random.choice(game_ids)}/status/',
+        'waiting games': lambda: '/api/waiting-games/',
+        'leaderboard': lambda: '/api/leaderboard/',
+    }
+
+    results = []
+    try:
+        for server_name, (command, env) in servers(args.workers, args.threads).items():
+            port = free_port()
+            process = start_server([part.format(port=port) for part in command], port, env=env)
+            try:
+                clients = [Client(f'http://127.0.0.1:{port}', token) for _ in range(args.concurrency)]
+                for endpoint_name, path in endpoints.items():
+                    def make_request(index):
+                        status, _, _ = clients[index].request('GET', path())
+                        return status == 200
+
+                    summary = summarize(*run_load(make_request, args.concurrency, args.duration))
+                    results.append((server_name, endpoint_name, summary))
+            finally:
+                stop_server(process)
+    finally:
+        cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--games', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        use_scratch_database(directory)
+        results = run(args)
+
+    print(f'{"server":<18} {"endpoint":<15} {"req/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"errors":>7}')
+    for server_name, endpoint_name, summary in results:
+        print(f'{server_name:<18} {endpoint_name:<15} {summary["rps"]:>9} {summary["p50_ms"]:>9} '
+              f'{summary["p99_ms"]:>9} {summary["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
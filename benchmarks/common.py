@@ -0,0 +1,170 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Scripts that write to the database call use_scratch_database() first, so
+they run against a temporary SQLite file and file cache unless SQLITE_PATH
+or DATABASE_PROFILE=postgres names a database explicitly. Seeded rows use
+the ``bench-`` username prefix and are deleted when a run finishes.
+"""
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BENCH_PREFIX = 'bench-'
+
+
+def use_scratch_database(directory):
+    """
+    Point this process, and the servers it starts, at a new SQLite database
+    and file cache in ``directory`` unless SQLITE_PATH or
+    DATABASE_PROFILE=postgres name a database; returns whether it did. Call
+    it before setup_django(), then migrate.
+    """
+    if os.environ.get('SQLITE_PATH') or os.environ.get('DATABASE_PROFILE') == 'postgres':
+        return False
+    os.environ['SQLITE_PATH'] = str(Path(directory) / 'bench.sqlite3')
+    os.environ['CACHE_DIR'] = str(Path(directory) / 'cache')
+    os.environ.pop('CACHE_URL', None)
+    return True
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_wordguessing.settings')
+    import django
+    django.setup()
+
+
+def access_token(player):
+    from rest_framework_simplejwt.tokens import AccessToken
+    return str(AccessToken.for_user(player))
+
+
+def cleanup():
+    from api.leaderboard import leaderboard, leaderboard_snapshots
+    from api.models import Player
+    Player.objects.filter(username__startswith=BENCH_PREFIX).delete()
+    leaderboard.invalidate()
+    leaderboard_snapshots.invalidate()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, env=None, timeout=30):
+    process = subprocess.Popen(
+        command, cwd=BASE_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}: {" ".join(command)}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f'Server did not start on port {port}: {" ".join(command)}')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Client:
+    """Minimal keep-alive HTTP client, one per load thread."""
+
+    def __init__(self, base_url, token=None):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.token = token
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        payload = response.read()
+        return response.status, payload, response
+
+
+def run_load(make_request, concurrency, duration):
+    """
+    Call ``make_request(worker_index)`` from ``concurrency`` threads for
+    ``duration`` seconds. Returns ``(latencies, errors, elapsed)``.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        local_latencies, local_errors = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                ok = make_request(index)
+            except Exception:
+                ok = False
+            local_latencies.append(time.perf_counter() - started)
+            if not ok:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.monotonic() - started
+
+
+def summarize(latencies, errors, elapsed):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
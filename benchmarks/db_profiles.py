@@ -0,0 +1,140 @@
+"""
+Guess write throughput under each DATABASE_PROFILE.
+
+Every load thread plays its own games as two players, so each request is a
+successful write (game update plus Guess insert) and the database's write
+path is the bottleneck. Seeded words contain no letter, every guess misses
+and a game lasts for one guess per letter of the benchmark alphabet.
+
+    python benchmarks/db_profiles.py --profiles sqlite-basic sqlite
+    DATABASE_PROFILE=postgres POSTGRES_DB=bench python benchmarks/db_profiles.py --profiles postgres
+
+SQLite profiles run against a fresh temporary file (SQLITE_PATH); the
+postgres profile uses the POSTGRES_* database as configured and migrates it.
+Each profile runs in its own process because settings are read once.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (  # noqa: E402
+    BENCH_PREFIX, Client, access_token, cleanup, free_port, run_load, setup_django, start_server, stop_server,
+    summarize,
+)
+
+
+# حروف لاتین، فارسی، یونانی و سیریلیک؛ کلمه‌ی بازی هیچ‌کدام را ندارد
+GUESS_LETTERS = (
+    'abcdefghijklmnopqrstuvwxyz'
+    'اآبپتثجچحخدذرزژسشصضطظعغفقکگلمنوهیئء'
+    'αβγδεζηθικλμνξοπρστυφχψω'
+    'бвгдежзийклмнопрстуфхцчшщыэюя'
+)
+
+SERVERS = {
+    'gunicorn': ['gunicorn', 'backend_wordguessing.wsgi:application', '--workers', '{workers}',
+                 '--threads', '{threads}', '--bind', '127.0.0.1:{port}'],
+    'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', '127.0.0.1:{port}'],
+}
+
+
+def seed(concurrency, games_per_thread):
+    from api.models import Game, Player
+
+    threads = []
+    for index in range(concurrency):
+        player1 = Player.objects.create_user(username=f'{BENCH_PREFIX}db-{index}-1', password='bench')
+        player2 = Player.objects.create_user(username=f'{BENCH_PREFIX}db-{index}-2', password='bench')
+        games = Game.objects.bulk_create([
+            Game(player1=player1, player2=player2, word='0', masked_word='_', difficulty='easy',
+                 status='active', turn=player1)
+            for _ in range(games_per_thread)
+        ])
+        threads.append(((access_token(player1), access_token(player2)), [game.id for game in games]))
+    return threads
+
+
+def run_profile(options):
+    """Benchmark the profile this process was started with and return its summary."""
+    from django.core.management import call_command
+
+    setup_django()
+    call_command('migrate', verbosity=0)
+    threads = seed(options.concurrency, options.games)
+
+    port = free_port()
+    command = [part.format(port=port, workers=options.workers, threads=options.threads)
+               for part in SERVERS[options.server]]
+    process = start_server(command, port)
+    local = threading.local()
+    guesses = [0] * options.concurrency
+
+    def make_request(index):
+        if not hasattr(local, 'client'):
+            local.client = Client(f'http://127.0.0.1:{port}')
+        tokens, game_ids = threads[index]
+        move = guesses[index]
+        game_number, letter_number = divmod(move, len(GUESS_LETTERS))
+        if game_number >= len(game_ids):
+            raise RuntimeError('Out of seeded games; raise --games')
+        guesses[index] += 1
+
+        # هر حدس اشتباه نوبت را به بازیکن دیگر می‌دهد
+        local.client.token = tokens[letter_number % 2]
+        status, _, _ = local.client.request(
+            'POST', f'/api/games/{game_ids[game_number]}/guess/', {'letter': GUESS_LETTERS[letter_number]}
+        )
+        return status == 200
+
+    try:
+        result = summarize(*run_load(make_request, options.concurrency, options.duration))
+    finally:
+        stop_server(process)
+        cleanup()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', default=['sqlite-basic', 'sqlite'])
+    parser.add_argument('--server', choices=sorted(SERVERS), default='gunicorn')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--games', type=int, default=20, help='games seeded per load thread')
+    parser.add_argument('--run-profile', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.run_profile:
+        print(json.dumps(run_profile(options)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in options.profiles:
+            env = {**os.environ, 'DATABASE_PROFILE': profile}
+            if profile.startswith('sqlite'):
+                env['SQLITE_PATH'] = str(Path(directory) / f'{profile}.sqlite3')
+            output = subprocess.run(
+                [sys.executable, __file__, '--run-profile', profile, *sys.argv[1:]],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[profile] = json.loads(output.strip().splitlines()[-1])
+
+    print(f'{"profile":<14} {"guesses":>8} {"errors":>7} {"guess/s":>8} {"p50 ms":>8} {"p99 ms":>8}')
+    for profile, row in results.items():
+        print(f'{profile:<14} {row["requests"]:>8} {row["errors"]:>7} {row["rps"]:>8} '
+              f'{row["p50_ms"]:>8} {row["p99_ms"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Full game lifecycle load test.
+
+Seeds M words, then drives N concurrent players through
+register -> login -> create game -> join -> guess until finished ->
+leaderboard / profile / history against a local server, and reports
+throughput and latency percentiles per endpoint. A serial in-process pass of
+the same lifecycle counts the database queries of every endpoint.
+
+    python benchmarks/lifecycle.py --players 40 --words 500
+    python benchmarks/lifecycle.py --save-baseline      # store the results
+    python benchmarks/lifecycle.py --compare            # exit 1 on regressions
+
+Without --url a server is started (runserver, or gunicorn/uvicorn with
+--server) on a temporary SQLite database and cache, unless SQLITE_PATH or
+DATABASE_PROFILE=postgres names one; --url requires naming the server's
+database, since the words are seeded into it. Baselines live in
+benchmarks/baselines/lifecycle.json; query counts are compared exactly,
+timings with --tolerance.
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.letters import ALPHABET  # noqa: E402
+from benchmarks.common import (  # noqa: E402
+    BENCH_PREFIX, Client, cleanup, free_port, percentile, setup_django, start_server, stop_server,
+    use_scratch_database,
+)
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'lifecycle.json'
+LATIN_GUESS_ORDER = 'eaoitnsrhldcumfpgwybvkxjqz'
+PASSWORD = 'bench-password'
+
+SERVERS = {
+    'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', '127.0.0.1:{port}'],
+    'gunicorn': ['gunicorn', 'backend_wordguessing.wsgi:application', '--workers', '2', '--threads', '8',
+                 '--bind', '127.0.0.1:{port}'],
+    'uvicorn': ['uvicorn', 'backend_wordguessing.asgi:application', '--workers', '2', '--no-access-log',
+                '--port', '{port}'],
+}
+
+
+def seed_words(count):
+    from api.models import Word
+    from api.word_pool import word_pool
+
+    rng = random.Random(count)
+    words = [
+        Word(text=''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))), difficulty='easy')
+        for _ in range(count)
+    ]
+    created = Word.objects.bulk_create(words)
+    word_pool.invalidate()
+    return [word.id for word in created]
+
+
+def delete_words(word_ids):
+    from api.models import Word
+    from api.word_pool import word_pool
+
+    Word.objects.filter(id__in=word_ids).delete()
+    word_pool.invalidate()
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+def endpoint_name(method, path):
+    parts = [part for part in path.split('/') if part and not part.isdigit()]
+    return f'{method} /{"/".join(parts)}/'
+
+
+def play(request, name_prefix, record):
+    """Run one lifecycle for a pair of players through ``request(client, method, path, data)``."""
+
+    def call(client, method, path, data=None, expect=(200, 201)):
+        started = time.perf_counter()
+        status, body = request(client, method, path, data)
+        record(endpoint_name(method, path), time.perf_counter() - started, status in expect)
+        if status not in expect:
+            raise RuntimeError(f'{method} {path} -> {status}: {body!r}')
+        return body
+
+    players = {}
+    for suffix in ('a', 'b'):
+        username = f'{name_prefix}-{suffix}'
+        client = {'token': None}
+        call(client, 'POST', '/api/register/', {'username': username, 'password': PASSWORD})
+        tokens = call(client, 'POST', '/api/login/', {'username': username, 'password': PASSWORD})
+        client['token'] = tokens['access']
+        players[username] = client
+
+    (name_a, client_a), (name_b, client_b) = players.items()
+    game_id = call(client_a, 'POST', '/api/create-game/', {'difficulty': 'easy'})['game_id']
+    turn = call(client_b, 'POST', f'/api/games/{game_id}/join/')['current_turn']
+
+    guess_order = LATIN_GUESS_ORDER + ''.join(letter for letter in ALPHABET if letter not in LATIN_GUESS_ORDER)
+    for letter in guess_order:
+        result = call(players[turn], 'POST', f'/api/games/{game_id}/guess/', {'letter': letter})
+        if result['game_status'] == 'finished':
+            break
+        turn = result['next_turn']
+
+    for client in (client_a, client_b):
+        call(client, 'GET', '/api/leaderboard/')
+        call(client, 'GET', '/api/profile/')
+        call(client, 'GET', '/api/history/')
+
+
+def http_request(base_url):
+    local = threading.local()
+
+    def request(client, method, path, data):
+        if not hasattr(local, 'http'):
+            local.http = Client(base_url)
+        local.http.token = client['token']
+        status, payload, _ = local.http.request(method, path, data)
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, payload[:200]
+
+    return request
+
+
+def run_load(base_url, players, rounds):
+    recorder = Recorder()
+    request = http_request(base_url)
+    run_id = int(time.time() * 1000) % 10 ** 8
+
+    def worker(index):
+        for round_index in range(rounds):
+            try:
+                play(request, f'{BENCH_PREFIX}{run_id}-{index}-{round_index}', recorder.add)
+            except Exception:
+                # درخواست ناموفق قبلاً به‌عنوان خطا ثبت شده است
+                pass
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(max(1, players // 2))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.monotonic() - started
+
+
+def count_queries():
+    """Serial in-process lifecycle that records the queries of every endpoint."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.test import APIClient
+
+    api_client = APIClient()
+    queries = {}
+
+    def request(client, method, path, data):
+        api_client.credentials(**({'HTTP_AUTHORIZATION': f'Bearer {client["token"]}'} if client['token'] else {}))
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(api_client, method.lower())(path, data, format='json')
+        queries[endpoint_name(method, path)] = max(queries.get(endpoint_name(method, path), 0), len(captured))
+        return response.status_code, getattr(response, 'data', None)
+
+    # شمارش با کش خالی و جدا از کش مشترک انجام می‌شود تا به اجراهای قبلی وابسته نباشد
+    with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+        play(request, f'{BENCH_PREFIX}queries', lambda *args: None)
+    return queries
+
+
+def report(recorder, elapsed, queries):
+    results = {}
+    for endpoint in sorted(recorder.latencies):
+        latencies = recorder.latencies[endpoint]
+        results[endpoint] = {
+            'requests': len(latencies),
+            'errors': recorder.errors[endpoint],
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries': queries.get(endpoint),
+        }
+    return results
+
+
+def print_results(results):
+    print(f'{"endpoint":<28} {"reqs":>6} {"err":>4} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8}')
+    for endpoint, row in results.items():
+        print(f'{endpoint:<28} {row["requests"]:>6} {row["errors"]:>4} {row["rps"]:>8} {row["p50_ms"]:>8} '
+              f'{row["p95_ms"]:>8} {row["p99_ms"]:>8} {row["queries"] if row["queries"] is not None else "-":>8}')
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for endpoint, expected in baseline.items():
+        actual = results.get(endpoint)
+        if actual is None:
+            continue
+        if expected.get('queries') is not None and actual['queries'] is not None \
+                and actual['queries'] > expected['queries']:
+            regressions.append(f'{endpoint}: {actual["queries"]} queries (baseline {expected["queries"]})')
+        if expected.get('p99_ms') and actual['p99_ms'] > expected['p99_ms'] * (1 + tolerance):
+            regressions.append(f'{endpoint}: p99 {actual["p99_ms"]} ms (baseline {expected["p99_ms"]} ms)')
+        if expected.get('rps') and actual['rps'] < expected['rps'] * (1 - tolerance):
+            regressions.append(f'{endpoint}: {actual["rps"]} req/s (baseline {expected["rps"]} req/s)')
+    return regressions
+
+
+def run(args):
+    from django.core.management import call_command
+
+    setup_django()
+    call_command('migrate', verbosity=0)
+    word_ids = seed_words(args.words)
+    process = None
+    try:
+        queries = count_queries()
+        base_url = args.url
+        if base_url is None:
+            port = free_port()
+            process = start_server([part.format(port=port) for part in SERVERS[args.server]], port)
+            base_url = f'http://127.0.0.1:{port}'
+        recorder, elapsed = run_load(base_url, args.players, args.rounds)
+    finally:
+        if process is not None:
+            stop_server(process)
+        delete_words(word_ids)
+        cleanup()
+    return recorder, elapsed, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=20, help='concurrent players (played in pairs)')
+    parser.add_argument('--rounds', type=int, default=3, help='games played by every pair')
+    parser.add_argument('--words', type=int, default=200)
+    parser.add_argument('--url', help='benchmark an already running server instead of starting one')
+    parser.add_argument('--server', choices=sorted(SERVERS), default='runserver')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed timing regression (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if use_scratch_database(directory) and args.url:
+            sys.exit('--url seeds words into the server\'s database: name it with SQLITE_PATH or '
+                     'DATABASE_PROFILE=postgres')
+        recorder, elapsed, queries = run(args)
+
+    results = report(recorder, elapsed, queries)
+    print_results(results)
+
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+        print(f'Baseline saved to {BASELINE_PATH}')
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            sys.exit(f'No baseline at {BASELINE_PATH}; run with --save-baseline first')
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print('No regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
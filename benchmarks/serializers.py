@@ -0,0 +1,114 @@
+"""
+Rows/sec of the DRF serializers for the game list shapes versus the dict
+builders in api.fast_serializers, and of JSONRenderer versus
+FastJSONRenderer. Rows are built in memory, so no database is touched.
+
+    python benchmarks/serializers.py --rows 20000
+
+Every fast result is checked to equal the serializer's output first.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import setup_django  # noqa: E402
+
+
+def build_rows(count):
+    """``(games, history values rows, waiting values rows, user_id)`` describing the same games."""
+    from django.utils import timezone
+
+    from api.models import Game, Player
+
+    rng = random.Random(count)
+    players = [Player(id=i, username=f'player-{i}') for i in range(1, 51)]
+    now = timezone.now()
+    games, history, waiting = [], [], []
+    for i in range(count):
+        player1 = players[0] if i % 2 else rng.choice(players[1:])
+        player2 = rng.choice([players[0], None]) if player1.id != 1 else rng.choice(players[1:] + [None])
+        game = Game(
+            id=i + 1, player1=player1, player2=player2, word='banana', masked_word='b_n_n_',
+            difficulty=rng.choice(['easy', 'medium', 'hard']), status=rng.choice(['active', 'finished']),
+            created_at=now - timedelta(minutes=i), started_at=rng.choice([None, now - timedelta(minutes=i)]),
+            player1_score=rng.randrange(0, 100, 20), player2_score=rng.randrange(0, 100, 20),
+        )
+        games.append(game)
+        history.append({
+            'id': game.id, 'difficulty': game.difficulty, 'status': game.status, 'masked_word': game.masked_word,
+            'started_at': game.started_at, 'player1_id': game.player1_id, 'player2_id': game.player2_id,
+            'player1_score': game.player1_score, 'player2_score': game.player2_score,
+            'player1__username': player1.username, 'player2__username': player2.username if player2 else None,
+            'ai_level': game.ai_level,
+        })
+        waiting.append({
+            'id': game.id, 'player1__username': player1.username, 'difficulty': game.difficulty,
+            'created_at': game.created_at, 'status': game.status, 'word': game.word,
+        })
+    return games, history, waiting, players[0].id
+
+
+def measure(function, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from api.fast_serializers import game_data, history_rows, waiting_game_rows
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import GameHistorySerializer, GameSerializer, WaitingGameSerializer
+
+    games, history, waiting, user_id = build_rows(args.rows)
+    context = {'request': SimpleNamespace(user=SimpleNamespace(id=user_id))}
+    for game in games:
+        game.turn = game.player1
+
+    cases = [
+        ('history', lambda: GameHistorySerializer(games, many=True, context=context).data,
+         lambda: history_rows(history, user_id)),
+        ('waiting games', lambda: WaitingGameSerializer(games, many=True).data,
+         lambda: waiting_game_rows(waiting)),
+        ('game', lambda: [GameSerializer(game).data for game in games],
+         lambda: [game_data(game) for game in games]),
+    ]
+
+    print(f'{"shape":<16} {"serializer rows/s":>18} {"fast rows/s":>12} {"speedup":>8}')
+    for name, slow, fast in cases:
+        expected = [dict(row) for row in slow()]
+        if fast() != expected:
+            sys.exit(f'{name}: fast output differs from the serializer')
+        slow_rate = measure(slow, args.rows, args.repeat)
+        fast_rate = measure(fast, args.rows, args.repeat)
+        print(f'{name:<16} {slow_rate:>18,.0f} {fast_rate:>12,.0f} {fast_rate / slow_rate:>7.1f}x')
+
+    data = {'next': None, 'results': history_rows(history, user_id)}
+    if FastJSONRenderer().render(data) != JSONRenderer().render(data):
+        sys.exit('FastJSONRenderer output differs from JSONRenderer')
+    slow_rate = measure(lambda: JSONRenderer().render(data), args.rows, args.repeat)
+    fast_rate = measure(lambda: FastJSONRenderer().render(data), args.rows, args.repeat)
+    label = 'render (orjson)' if orjson is not None else 'render (json)'
+    print(f'{label:<16} {slow_rate:>18,.0f} {fast_rate:>12,.0f} {fast_rate / slow_rate:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()